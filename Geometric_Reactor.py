@@ -1,22 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pyaudio
+from audio_capture import AudioCapture
+from spectrum_engine import SpectrumEngine
 
 # --- CONFIGURATION ---
 CHUNK = 1024 * 2             
-FORMAT = pyaudio.paInt16     
 CHANNELS = 1                 
 RATE = 44100                 
 
-# --- SETUP PYAUDIO ---
-p = pyaudio.PyAudio()
-stream = p.open(
-    format=FORMAT,
-    channels=CHANNELS,
-    rate=RATE,
-    input=True,
-    frames_per_buffer=CHUNK
-)
+# --- SETUP AUDIO CAPTURE ---
+capture = AudioCapture(rate=RATE, chunk=CHUNK, channels=CHANNELS)
+engine = SpectrumEngine(size=CHUNK)
 
 # --- SETUP GEOMETRIC PLOT (POLAR) ---
 # We use a Polar projection to make it circular
@@ -44,16 +38,12 @@ print("Geometric Reactor Started... Make some noise!")
 try:
     while True:
         # 1. Read & Process Data
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        data_int = np.frombuffer(data, dtype=np.int16)
+        data_int = capture.latest(CHUNK, out=engine.samples)
         
-        # 2. FFT
-        # Simple Hanning window
-        windowed_data = data_int * np.hanning(len(data_int))
-        fft_data = np.abs(np.fft.rfft(windowed_data)) 
+        # 2. FFT (Hanning window, reused buffers)
+        fft_data_log = engine.decibels(data_int)
 
-        # 3. Log Scale & Threshold (Noise Gate)
-        fft_data_log = 20 * np.log10(fft_data + 1e-10)
+        # 3. Threshold (Noise Gate)
         threshold = 50
         fft_data_log[fft_data_log < threshold] = 0
         
@@ -80,8 +70,6 @@ try:
         plt.pause(0.001)
 
 except KeyboardInterrupt:
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+    capture.close()
 
     
\ No newline at end of file
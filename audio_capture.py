@@ -0,0 +1,118 @@
+import numpy as np
+
+# --- CONFIGURATION ---
+RATE = 44100
+CHUNK = 1024
+BUFFER_SECONDS = 4          # How much history the ring keeps (covers long frames)
+
+
+# --- RING BUFFER ---
+class RingBuffer:
+    """Preallocated circular sample buffer.
+
+    One writer (the PyAudio callback thread) and one reader (the render loop).
+    The writer copies samples in first and only then bumps `total_written`, so
+    the reader never needs a lock: it snapshots the counter and copies out
+    everything behind it.
+    """
+
+    def __init__(self, capacity, channels=1, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.channels = channels
+        shape = (self.capacity,) if channels == 1 else (self.capacity, channels)
+        self.data = np.zeros(shape, dtype=dtype)
+        self.total_written = 0  # Absolute sample counter (never wraps)
+
+    def write(self, samples):
+        n = len(samples)
+        if n >= self.capacity:
+            # Only the newest `capacity` samples can survive anyway
+            samples = samples[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+        start = (self.total_written + skipped) % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.total_written += skipped + n
+
+    def read(self, start, n, out=None):
+        """Copy `n` samples starting at absolute sample index `start`.
+
+        Anything older than the ring (or not yet written) comes back as zeros.
+        """
+        if out is None:
+            out = np.empty((n,) + self.data.shape[1:], dtype=self.data.dtype)
+        end = start + n
+        oldest = self.total_written - self.capacity
+        lo = max(start, oldest, 0)
+        hi = min(end, self.total_written)
+        if hi <= lo:
+            out[:] = 0
+            return out
+        out[:lo - start] = 0
+        out[hi - start:] = 0
+
+        pos = lo % self.capacity
+        count = hi - lo
+        first = min(count, self.capacity - pos)
+        dst = out[lo - start:hi - start]
+        dst[:first] = self.data[pos:pos + first]
+        dst[first:] = self.data[:count - first]
+        return out
+
+    def latest(self, n, out=None):
+        """The most recent `n` samples, oldest first. Never blocks."""
+        return self.read(self.total_written - n, n, out=out)
+
+
+# --- CAPTURE ---
+class AudioCapture:
+    """Microphone input in PyAudio callback mode, feeding a RingBuffer.
+
+    The device thread keeps filling the ring at its own rate, so the render
+    loop can grab the newest samples whenever it likes instead of blocking in
+    `stream.read()`. PyAudio is only imported here, so RingBuffer and the
+    rest of this module work on machines without PortAudio (offline
+    rendering, test signals).
+    """
+
+    def __init__(self, rate=RATE, chunk=CHUNK, channels=1, seconds=BUFFER_SECONDS):
+        self.rate = rate
+        self.chunk = chunk
+        self.channels = channels
+        self.ring = RingBuffer(rate * seconds, channels=channels)
+        self.overflows = 0
+
+        import pyaudio
+        self._pyaudio = pyaudio
+
+        self.pa = pyaudio.PyAudio()
+        self.stream = self.pa.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=chunk,
+            stream_callback=self._callback,
+        )
+        self.stream.start_stream()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        self.ring.write(samples)
+        if status & self._pyaudio.paInputOverflow:
+            self.overflows += 1
+        return (None, self._pyaudio.paContinue)
+
+    def latest(self, n, out=None):
+        return self.ring.latest(n, out=out)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.pa.terminate()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# --- CONFIGURATION ---
+RATE = 44100
+BARS = 180
+FMIN = 20.0                 # Lowest band edge (Hz)
+SCALES = ('log', 'mel', 'octave')
+
+
+# --- FREQUENCY SCALES ---
+def hz_to_mel(f):
+    return 2595.0 * np.log10(1.0 + np.asarray(f) / 700.0)
+
+
+def mel_to_hz(m):
+    return 700.0 * (10.0 ** (np.asarray(m) / 2595.0) - 1.0)
+
+
+def third_octave_centers(fmin=FMIN, fmax=RATE / 2):
+    """Standard 1/3-octave centre frequencies (base-2, 1 kHz reference)."""
+    k_lo = int(np.ceil(3 * np.log2(fmin / 1000.0)))
+    k_hi = int(np.floor(3 * np.log2(fmax / 1000.0)))
+    return 1000.0 * 2.0 ** (np.arange(k_lo, k_hi + 1) / 3.0)
+
+
+def _triangles(freqs, points):
+    # points = [lo, c1, c2, ..., cN, hi]: band i rises lo->ci, falls ci->hi
+    lo, center, hi = points[:-2, None], points[1:-1, None], points[2:, None]
+    rise = (freqs - lo) / (center - lo)
+    fall = (hi - freqs) / (hi - center)
+    return np.maximum(0.0, np.minimum(rise, fall))
+
+
+# --- BAND MAPPER ---
+class BandMapper:
+    """Maps a full rfft magnitude onto N perceptual bands with one matmul.
+
+    The (bands x bins) weight matrix is built once. Each row is normalised
+    to sum to 1, so a band's value is the weighted average magnitude of the
+    bins it covers and the reactors' dB scaling still applies unchanged.
+    Bands narrower than one FFT bin (deep bass at small n_fft) fall back to
+    the nearest bin so no bar is ever stuck at zero.
+
+    'log' and 'mel' give `n_bands` overlapping triangular bands between
+    fmin and fmax. 'octave' gives standard 1/3-octave bands, so its band
+    count comes from the frequency range instead of `n_bands`.
+    """
+
+    def __init__(self, n_fft, rate=RATE, n_bands=BARS, scale='log',
+                 fmin=FMIN, fmax=None):
+        if scale not in SCALES:
+            raise ValueError(f"Unknown band scale '{scale}', pick one of {SCALES}")
+        fmax = fmax or rate / 2
+        freqs = np.fft.rfftfreq(n_fft, d=1.0 / rate)
+
+        if scale == 'log':
+            points = np.geomspace(fmin, fmax, n_bands + 2)
+            weights = _triangles(freqs, points)
+            centers = points[1:-1]
+        elif scale == 'mel':
+            points = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_bands + 2))
+            weights = _triangles(freqs, points)
+            centers = points[1:-1]
+        else:
+            centers = third_octave_centers(fmin, fmax)
+            lo = centers[:, None] * 2.0 ** (-1 / 6)
+            hi = centers[:, None] * 2.0 ** (1 / 6)
+            weights = ((freqs >= lo) & (freqs < hi)).astype(np.float64)
+
+        empty = weights.sum(axis=1) == 0
+        if empty.any():
+            nearest = np.abs(freqs[None, :] - centers[empty, None]).argmin(axis=1)
+            weights[np.flatnonzero(empty), nearest] = 1.0
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        self.n_fft = n_fft
+        self.rate = rate
+        self.scale = scale
+        self.centers = centers
+        self.n_bands = len(centers)
+        # Stored transposed so both a single frame (bins,) and a stack of
+        # frames (frames, bins) map with the same `x @ weights_t`
+        self.weights_t = np.ascontiguousarray(weights.T, dtype=np.float32)
+
+    def apply(self, magnitude, out=None):
+        """(bins,) -> (bands,) or (frames, bins) -> (frames, bands)."""
+        if out is None:
+            return np.matmul(magnitude, self.weights_t)
+        return np.matmul(magnitude, self.weights_t, out=out)
@@ -0,0 +1,118 @@
+import argparse
+import glob
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from fft_backend import get_backend
+from spectrogram_image import save_spectrogram_png
+from spectrogram_stream import NFFT, NOVERLAP, stream_spectrogram
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+MAX_COLUMNS = 4000          # PNGs are at most this many pixels wide
+FREQ_LIMIT = 10000          # Same zoom spectrogram.py uses
+
+
+def find_inputs(patterns):
+    """Expand directories (all *.wav inside, recursively) and glob patterns."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*.wav')
+        paths.extend(glob.glob(pattern, recursive=True))
+    return sorted(set(paths))
+
+
+def output_names(paths):
+    """Output name (no extension) per input: its path relative to the inputs' common folder.
+
+    d1/rec.wav and d2/rec.wav become d1/rec and d2/rec, so files with the
+    same basename in different folders never share an output.
+    """
+    folders = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(folders) if folders else ''
+    return {path: os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0] for path in paths}
+
+
+def process_file(path, out_dir, nfft=NFFT, noverlap=NOVERLAP, png=False, log_freq=False, name=None):
+    """Spectrogram one WAV into out_dir/<name>.npz (+ .png). Returns seconds of audio.
+
+    The .npz holds Pxx (bins, columns) like plt.specgram returns it, plus
+    freqs, times, nfft and noverlap. `name` defaults to the file's
+    basename; see output_names().
+    """
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    npz_path = os.path.join(out_dir, name + '.npz')
+    os.makedirs(os.path.dirname(npz_path), exist_ok=True)
+    fd, scratch = tempfile.mkstemp(suffix='.npy', dir=out_dir)
+    os.close(fd)
+
+    # Columns stream to a scratch memmap first so memory stays flat,
+    # then get copied into the .npz. One FFT thread per file: the pool
+    # already runs one file per core.
+    try:
+        pxx, freqs, times = stream_spectrogram(path, scratch, nfft=nfft, noverlap=noverlap,
+                                               backend=get_backend(workers=1))
+        # .T is a free view; np.save stores it Fortran-ordered without a copy
+        np.savez(npz_path, Pxx=pxx.T, freqs=freqs, times=times, nfft=nfft, noverlap=noverlap)
+        if png and len(times):
+            step = max(1, len(times) // MAX_COLUMNS)
+            save_spectrogram_png(os.path.join(out_dir, name + '.png'), pxx[::step], freqs,
+                                 f_max=FREQ_LIMIT, log_freq=log_freq)
+        del pxx
+    finally:
+        os.remove(scratch)
+    return WavFile(path).duration
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spectrogram a batch of WAV recordings in parallel.",
+                                     epilog="Each <name>.npz holds Pxx (bins x columns, as plt.specgram returns it), "
+                                            "freqs, times, nfft and noverlap.")
+    parser.add_argument('inputs', nargs='+', help="Directories and/or glob patterns of .wav files")
+    parser.add_argument('-o', '--out', default='spectrograms', help="Output directory")
+    parser.add_argument('--nfft', type=int, default=NFFT)
+    parser.add_argument('--noverlap', type=int, default=NOVERLAP)
+    parser.add_argument('--png', action='store_true', help="Also write a PNG per file")
+    parser.add_argument('--log-freq', action='store_true', help="Log-spaced frequency axis in PNGs")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    paths = find_inputs(args.inputs)
+    names = output_names(paths)
+    if not paths:
+        print("No .wav files found.")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    print(f"Processing {len(paths)} files on {args.workers} workers...")
+
+    done, failed, audio_seconds = 0, 0, 0.0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(process_file, path, args.out, args.nfft, args.noverlap, args.png, args.log_freq,
+                        names[path]): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                audio_seconds += future.result()
+                done += 1
+            except Exception as e:
+                failed += 1
+                print(f"FAILED {path}: {e}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {done} files ({failed} failed) in {elapsed:.1f} s")
+    print(f"Throughput: {done / elapsed:.2f} files/s, "
+          f"{audio_seconds / 3600 / elapsed:.3f} audio-hours/s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+import math
+from collections import deque
+
+import numpy as np
+import pygame
+
+# --- PIXEL DECAY ---
+MAX_SHIFT = 7               # p -= p >> 7 is the slowest decay a uint8 channel can do (half-life ~88 frames)
+CHUNK_PIXELS = 1 << 16      # Pixels decayed per step, so a step's arrays stay in cache
+# 4x4 ordered dither thresholds: which pixels take the faster of two neighbouring shifts
+BAYER_4 = (np.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]]) + 0.5) / 16
+
+
+def fade_persistence(surface, color, alpha):
+    """How many fades it takes until no pixel of `surface`'s format changes any more.
+
+    Runs pygame's own alpha blend over every 0..255 level (so rounding is
+    exactly what the screen will see) until a fade is a no-op. After that
+    many frames without drawing, a pixel is settled and fading it again
+    would not change it.
+    """
+    levels = pygame.Surface((256, 1), 0, surface)
+    for i in range(256):
+        levels.set_at((i, 0), (i, i, i))
+    fade = pygame.Surface((256, 1), 0, surface)
+    fade.fill(color)
+    fade.set_alpha(alpha)
+
+    frames = 0
+    before = pygame.image.tobytes(levels, 'RGB')
+    while True:
+        levels.blit(fade, (0, 0))
+        frames += 1
+        after = pygame.image.tobytes(levels, 'RGB')
+        if after == before:
+            return frames
+        before = after
+
+
+def half_life_for_alpha(alpha):
+    """Half-life in frames of the old fade blit: each frame keeps (1 - alpha/255) of the trail."""
+    return math.log(0.5) / math.log(1 - alpha / 255)
+
+
+def shift_mix(half_life):
+    """(n, w): decaying by p >> n on a fraction w of frames and p >> (n + 1) on the rest
+    gives `half_life` frames on average.
+
+    p -= p >> n keeps 1 - 2**-n of a channel, so only a few half-lives are
+    available directly (1, 2.4, 5.2, 10.7, ... frames); mixing the two
+    neighbouring shifts in the right proportion hits anything in between.
+    """
+    keep = 0.5 ** (1 / max(half_life, 1.0))
+    logs = [math.log(1 - 2.0 ** -n) for n in range(1, MAX_SHIFT + 1)]
+    n = 1
+    while n < MAX_SHIFT and logs[n] < math.log(keep):
+        n += 1
+    if n == MAX_SHIFT:
+        return n, 1.0
+    return n, (math.log(keep) - logs[n]) / (logs[n - 1] - logs[n])
+
+
+def _decay_step(x, n):
+    # What one frame does to a (lifted) channel value
+    return x - ((x >> n) | 1)
+
+
+def _lift(background, n):
+    """Smallest value that one decay step by n takes exactly to `background`.
+
+    Every channel is raised to at least this before decaying, so settled
+    pixels land on the background again each frame instead of drifting.
+    """
+    x = np.arange(1, 256)
+    hit = np.flatnonzero(_decay_step(x, n) == background)
+    return int(x[hit[0]]) if len(hit) else int(x[np.abs(_decay_step(x, n) - background).argmin()])
+
+
+def decay_persistence(background, shifts):
+    """Frames until every 0..255 level of a channel has decayed to `background`, for the slowest of `shifts`."""
+    frames = 0
+    for n in shifts:
+        levels = np.arange(256)
+        lift = _lift(background, n)
+        count = 0
+        while True:
+            after = _decay_step(np.maximum(levels, lift), n)
+            count += 1
+            if np.array_equal(after, levels):
+                break
+            levels = after
+        frames = max(frames, count)
+    return frames
+
+
+class PixelDecay:
+    """Trail fade done in place on the screen's pixels, with exponential decay.
+
+    The fade blit mixes a fixed colour in at a fixed alpha: one linear
+    fade for all channels, and SDL blends every pixel through a second
+    surface. Here each frame every channel simply loses a fraction of
+    itself, straight in the screen's memory (pygame.surfarray.pixels2d):
+
+        p = max(p, lift);  p -= (p >> n) | 1
+
+    The shift is done on whole 32-bit pixel words with a per-channel mask,
+    so channels that share a shift go in one pass, and the region is
+    worked through in cache-sized blocks of rows. The `| 1` makes sure dim values keep
+    falling instead of stalling below 2**n, and the lift is chosen so
+    that a settled pixel lands on `background` exactly.
+
+    - half_life: frames until a trail is half as bright; a number or an
+      (r, g, b) tuple for per-channel decay (e.g. red lingering longer).
+      In-between values are reached by alternating two shifts over frames.
+    - edge_half_life: optional radial falloff; the half-life blends from
+      `half_life` at `center` (default: screen centre) to this at the
+      farthest corner. Per-pixel shifts follow an ordered dither that
+      moves every frame, so each pixel averages its own half-life. It
+      reads two extra screen-sized maps, so it is slower than the plain
+      decay.
+    """
+
+    def __init__(self, screen, background, half_life, edge_half_life=None, center=None):
+        if screen.get_bytesize() != 4:
+            raise ValueError("PixelDecay needs a 32-bit screen")
+        self.screen = screen
+        self.background = tuple(background)[:3]
+        width, height = screen.get_size()
+        # Byte of each of R, G, B within a pixel word
+        self.lanes = [shift // 8 for shift in screen.get_shifts()[:3]]
+        one = np.zeros(4, dtype=np.uint8)
+        one[self.lanes] = 1
+        self.one_row = np.tile(one, width)
+
+        half_lives = np.broadcast_to(np.asarray(half_life, dtype=np.float64), 3)
+        self.mixes = [shift_mix(h) for h in half_lives]
+        # Fast shift first: the trail starts out dropping like the fade it replaces
+        self.credit = [1.0 - w for _, w in self.mixes]
+        self._plans = {}
+        self._scratch = np.empty(max(CHUNK_PIXELS, width), dtype=np.uint32)
+
+        if edge_half_life is not None:
+            self._radial_maps(half_lives, edge_half_life, center)
+            shifts = np.unique(self.shift_map.reshape(height + 3, width + 3, 4)[:, :, self.lanes])
+        else:
+            self.shift_map = None
+            shifts = {min(n + k, MAX_SHIFT) for n, _ in self.mixes for k in (0, 1)}
+        self.persistence = max(decay_persistence(b, [int(n) for n in shifts]) for b in self.background)
+
+    def _radial_maps(self, half_lives, edge_half_life, center):
+        # The maps are 3 px larger than the screen: each frame reads them at
+        # the next of 16 offsets (see __call__), so over 16 frames every pixel
+        # meets every dither threshold and alternates between its two shifts
+        width, height = self.screen.get_size()
+        width, height = width + 3, height + 3
+        cx, cy = center if center is not None else ((width - 3) / 2, (height - 3) / 2)
+        r = np.hypot(np.arange(width) - cx, np.arange(height)[:, None] - cy)
+        r = np.minimum(r / np.hypot(max(cx, width - 4 - cx), max(cy, height - 4 - cy)), 1.0)
+        edges = np.broadcast_to(np.asarray(edge_half_life, dtype=np.float64), 3)
+        dither = np.tile(BAYER_4, (height // 4 + 1, width // 4 + 1))[:height, :width]
+        # Offsets in Bayer order, so consecutive frames use far-apart thresholds
+        self.offsets = [divmod(int(i), 4) for i in np.argsort(BAYER_4, axis=None)]
+        self.frame = 0
+        # shift_mix is cheap but scalar: tabulate it on a fine log grid of half-lives
+        grid = np.geomspace(1.0, 2.0 ** (MAX_SHIFT + 1), 1024)
+        mixes = np.array([shift_mix(h) for h in grid])
+
+        self.shift_map = np.full((height, width, 4), 8, dtype=np.uint8)  # >> 8 leaves the unused byte alone
+        self.lift_map = np.zeros((height, width, 4), dtype=np.uint8)
+        for channel, lane in enumerate(self.lanes):
+            # Geometric blend: the half-life grows by the same factor per step outwards
+            h = half_lives[channel] ** (1 - r) * edges[channel] ** r
+            index = np.minimum(np.searchsorted(grid, h), len(grid) - 1)
+            n, w = mixes[index, 0], mixes[index, 1]
+            shift = np.where(dither < w, n, np.minimum(n + 1, MAX_SHIFT)).astype(np.uint8)
+            lifts = np.array([_lift(self.background[channel], k) for k in range(MAX_SHIFT + 1)], dtype=np.uint8)
+            self.shift_map[:, :, lane] = shift
+            self.lift_map[:, :, lane] = lifts[shift]
+        self.shift_map = self.shift_map.reshape(height, width * 4)
+        self.lift_map = self.lift_map.reshape(height, width * 4)
+
+    def _next_shifts(self):
+        # Per channel: the faster shift while it has credit, else the slower one
+        shifts = []
+        for channel, (n, w) in enumerate(self.mixes):
+            self.credit[channel] += w
+            if self.credit[channel] >= 1.0:
+                self.credit[channel] -= 1.0
+                shifts.append(n)
+            else:
+                shifts.append(min(n + 1, MAX_SHIFT))
+        return tuple(shifts)
+
+    def _plan(self, shifts):
+        # (lift row, [(n, mask, one), ...]) for one combination of channel shifts
+        plan = self._plans.get(shifts)
+        if plan is None:
+            lift = np.zeros(4, dtype=np.uint8)
+            passes = {}
+            for channel, (lane, n) in enumerate(zip(self.lanes, shifts)):
+                lift[lane] = _lift(self.background[channel], n)
+                mask, one = passes.get(n, (0, 0))
+                passes[n] = (mask | (0xFF >> n) << 8 * lane, one | 1 << 8 * lane)
+            row = np.tile(lift, self.screen.get_width())
+            plan = (row, [(n, np.uint32(mask), np.uint32(one)) for n, (mask, one) in passes.items()])
+            self._plans[shifts] = plan
+        return plan
+
+    def __call__(self, region):
+        """Decay the pixels inside `region` (a Rect) by one frame."""
+        x0, y0, x1, y1 = region.left, region.top, region.right, region.bottom
+        width = x1 - x0
+        # While these views exist the screen is locked; they go when we return
+        words = pygame.surfarray.pixels2d(self.screen).T[y0:y1, x0:x1]
+        pixels = words.view(np.uint8)
+        if self.shift_map is None:
+            lift, passes = self._plan(self._next_shifts())
+            lift = lift[:4 * width]
+        else:
+            dy, dx = self.offsets[self.frame % len(self.offsets)]
+            self.frame += 1
+            shift_map = self.shift_map[y0 + dy:y1 + dy, 4 * (x0 + dx):4 * (x1 + dx)]
+            lift_map = self.lift_map[y0 + dy:y1 + dy, 4 * (x0 + dx):4 * (x1 + dx)]
+            one = self.one_row[:4 * width]
+
+        # A block of rows at a time, so all the steps below run in cache
+        step = max(1, CHUNK_PIXELS // width)
+        for top in range(0, y1 - y0, step):
+            rows, row_pixels = words[top:top + step], pixels[top:top + step]
+            scratch = self._scratch[:rows.size].reshape(rows.shape)
+            if self.shift_map is None:
+                np.maximum(row_pixels, lift, out=row_pixels)
+                for n, mask, bit in passes:
+                    np.right_shift(rows, n, out=scratch)
+                    scratch &= mask
+                    scratch |= bit
+                    rows -= scratch
+            else:
+                scratch = scratch.view(np.uint8)
+                np.maximum(row_pixels, lift_map[top:top + step], out=row_pixels)
+                np.right_shift(row_pixels, shift_map[top:top + step], out=scratch)
+                scratch |= one
+                row_pixels -= scratch
+
+
+class Compositor:
+    """Trail fading and dirty-rect display updates for the reactor loop.
+
+    The reactors used to allocate a full-screen fade Surface every frame,
+    blend it over the whole window and flip all of it. Here the fade
+    surface is made once, and everything drawn is reported with `touch()`
+    (pygame.draw.* return the Rect they hit). A pixel only keeps changing
+    for `persistence` frames after it was last drawn, so:
+
+    - `fade_trails()` fades just the union of the last `persistence`
+      frames' drawing, once per pixel; the rest of the screen is already
+      settled and a fade would not change it
+    - `present()` pushes only that region plus this frame's drawing
+      through pygame.display.update
+
+    The history starts out as `persistence` full-window frames, so the
+    first frames fade the whole (initially black) window just like before.
+    The result is pixel-identical to fading and flipping the full window.
+    fade_alpha=None clears to `background` every frame instead (no trails).
+
+    half_life=... fades with a PixelDecay on the screen's pixels instead
+    of the blit: exponential, tunable per channel and radially (see
+    PixelDecay), and about twice as fast at 1080p. Not pixel-identical to
+    the alpha fade, but the same dirty-rect bookkeeping applies.
+
+    The screen itself is the trail layer. Geometry and particles are drawn
+    straight onto it, and the compositor only tracks where they landed:
+    separate offscreen layers would each cost a full-frame blit.
+    """
+
+    def __init__(self, screen, background, fade_alpha=None, half_life=None, edge_half_life=None, center=None):
+        self.screen = screen
+        self.bounds = screen.get_rect()
+        self.background = background
+        self.fade = pygame.Surface(screen.get_size(), 0, screen)
+        self.fade.fill(background)
+        self.decay = None
+        if half_life is not None:
+            self.decay = PixelDecay(screen, background, half_life, edge_half_life, center)
+            persistence = self.decay.persistence
+        elif fade_alpha is not None:
+            self.fade.set_alpha(fade_alpha)
+            persistence = fade_persistence(screen, background, fade_alpha)
+        else:
+            persistence = 1
+        # Drawn rect of each recent frame; starts as "everything"
+        self.history = deque([self.bounds.copy()] * persistence, maxlen=persistence)
+        self.touched = []
+
+    def _recent(self):
+        rects = [r for r in self.history if r]
+        return rects[0].unionall(rects[1:]) if rects else None
+
+    def fade_trails(self):
+        """Fade (or clear) whatever the last few frames drew. Call at frame start."""
+        region = self._recent()
+        if region is None:
+            return
+        if self.decay is not None:
+            self.decay(region)
+        else:
+            self.screen.blit(self.fade, region.topleft, region)
+
+    def touch(self, rect):
+        """Record a drawn area (pygame.draw.* return value); returns it unchanged."""
+        self.touched.append(rect)
+        return rect
+
+    def present(self):
+        """Update the display where something changed this frame. Replaces display.flip()."""
+        frame = self.touched[0].unionall(self.touched[1:]).clip(self.bounds) if self.touched else None
+        recent = self._recent()
+        self.history.append(frame)
+        self.touched.clear()
+
+        changed = [r for r in (frame, recent) if r]
+        if changed:
+            pygame.display.update(changed[0].unionall(changed[1:]))
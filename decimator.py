@@ -0,0 +1,72 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- CONFIGURATION ---
+PASSBAND = 0.8              # Fraction of the output Nyquist we keep clean
+STOPBAND_DB = 100           # Alias rejection, to match the spectrograms' dynamic range
+
+
+def factor_for(rate, fmax):
+    """Largest integer decimation that still keeps 0..fmax inside the passband."""
+    return max(1, int(PASSBAND * rate / (2 * fmax)))
+
+
+def lowpass_taps(factor, numtaps=None):
+    """Kaiser-windowed sinc anti-alias filter for decimating by `factor`.
+
+    Flat up to PASSBAND x the new Nyquist and ~STOPBAND_DB down
+    from (2 - PASSBAND) x the new Nyquist on. That is where the first
+    alias of the passband starts, so nothing folds back into 0..fmax.
+    The length is Kaiser's estimate for that transition (~32 taps per
+    unit of factor).
+    """
+    nyquist = 0.5 / factor  # Cycles per input sample
+    width = 2 * (1 - PASSBAND) * nyquist
+    numtaps = numtaps or int(np.ceil((STOPBAND_DB - 7.95) / (14.36 * width))) // 2 * 2 + 1
+    beta = 0.1102 * (STOPBAND_DB - 8.7)
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    taps = 2 * nyquist * np.sinc(2 * nyquist * n) * np.kaiser(numtaps, beta)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class StreamingDecimator:
+    """Anti-aliased integer downsampling that keeps its state across blocks.
+
+    Only every `factor`-th filter output is ever computed: the input is
+    viewed as strided, overlapping filter windows (no copy) and one matmul
+    evaluates just the windows that survive the downsampling, which is the
+    same work as a polyphase filter bank. Blocks may be (n,) or
+    (n, channels); channels are filtered independently in the same matmul.
+    The tail of each block is carried
+    into the next, so feeding a signal in pieces gives exactly the output of
+    filtering it in one go. Output sample m lines up with input sample
+    m * factor, delayed by the filter's (numtaps - 1) / 2 samples.
+    """
+
+    def __init__(self, factor, numtaps=None):
+        self.factor = factor
+        self.taps = lowpass_taps(factor, numtaps)
+        self._reversed = np.ascontiguousarray(self.taps[::-1])
+        self.history = np.zeros(len(self.taps) - 1, dtype=np.float32)
+        self.offset = 0     # Where the next kept window starts inside history + block
+
+    def process(self, block):
+        """Feed input samples; returns the decimated samples they complete."""
+        if self.factor == 1:
+            return np.asarray(block, dtype=np.float32)
+        numtaps = len(self.taps)
+        block = np.asarray(block, dtype=np.float32)
+        if self.history.shape[1:] != block.shape[1:]:
+            self.history = np.zeros((numtaps - 1,) + block.shape[1:], dtype=np.float32)
+        buf = np.concatenate((self.history, block))
+        if len(buf) - numtaps < self.offset:
+            out = np.empty((0,) + block.shape[1:], dtype=np.float32)
+            next_start = self.offset
+        else:
+            windows = sliding_window_view(buf, numtaps, axis=0)[self.offset::self.factor]
+            out = windows @ self._reversed
+            next_start = self.offset + len(out) * self.factor
+        keep = min(next_start, len(buf))
+        self.history = buf[keep:]
+        self.offset = next_start - keep
+        return out
@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+
+# --- CONFIGURATION ---
+# Set FFT_BACKEND=numpy|scipy|pyfftw to force one; otherwise the fastest
+# library that imports wins.
+PREFERENCE = ('pyfftw', 'scipy', 'numpy')
+WORKERS = os.cpu_count() or 1
+THREADED_MIN_SIZE = 1 << 16  # Smaller transforms run faster on one thread
+PLAN_SAMPLES = 1 << 16      # Batched FFTW plans take PLAN_SAMPLES // n rows at a time
+
+
+class NumpyBackend:
+    """Plain np.fft. Always available."""
+    name = 'numpy'
+
+    def __init__(self, workers=1):
+        self.workers = 1
+        self._has_out = _numpy_rfft_has_out()
+
+    def rfft(self, x, axis=-1, out=None):
+        if out is None:
+            return np.fft.rfft(x, axis=axis)
+        if self._has_out:
+            return np.fft.rfft(x, axis=axis, out=out)
+        out[...] = np.fft.rfft(x, axis=axis)
+        return out
+
+
+class ScipyBackend:
+    """scipy.fft: keeps float32 as float32 and spreads batches over `workers`.
+
+    pocketfft caches its own plans per transform size, so repeated calls at
+    the same size only pay for the transform itself.
+    """
+    name = 'scipy'
+
+    def __init__(self, workers=WORKERS):
+        import scipy.fft
+        self._fft = scipy.fft
+        self.workers = workers
+
+    def rfft(self, x, axis=-1, out=None):
+        workers = self.workers if x.size >= THREADED_MIN_SIZE else 1
+        result = self._fft.rfft(x, axis=axis, workers=workers)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+
+class PyFFTWBackend:
+    """pyFFTW, planned per transform length rather than per array shape.
+
+    Each length n gets (on first use) one plan for a single transform and
+    one for a block of PLAN_SAMPLES // n rows. A batch of any row count runs
+    block by block through the same plan (the last block zero-padded), so
+    batches whose size changes every call - STFTScheduler catching up,
+    StreamingSTFT tails - never trigger FFTW_MEASURE planning again, and
+    the plans and their aligned buffers stay bounded by the lengths used.
+    """
+    name = 'pyfftw'
+
+    def __init__(self, workers=WORKERS):
+        import pyfftw
+        self._pyfftw = pyfftw
+        self.workers = workers
+        self._plans = {}
+
+    def _plan(self, shape, dtype):
+        # shape is (n,) or (PLAN_SAMPLES // n, n): two plans per length at most
+        key = (shape, dtype.str)
+        plan = self._plans.get(key)
+        if plan is None:
+            template = self._pyfftw.empty_aligned(shape, dtype=dtype)
+            threads = self.workers if template.size >= THREADED_MIN_SIZE else 1
+            plan = self._pyfftw.builders.rfft(
+                template, axis=-1, threads=threads,
+                planner_effort='FFTW_MEASURE', avoid_copy=False,
+            )
+            self._plans[key] = plan
+        return plan
+
+    def rfft(self, x, axis=-1, out=None):
+        if x.dtype not in (np.float32, np.float64):
+            x = x.astype(np.float64)
+        x = np.moveaxis(x, axis, -1)
+        n = x.shape[-1]
+        if x.ndim == 1:
+            result = self._plan((n,), x.dtype)(x)  # Plan's own output array, reused
+            if out is None:
+                return result.copy()
+            out[...] = result
+            return out
+
+        rows = x.reshape(-1, n)
+        if len(rows) == 1:
+            result = self._plan((n,), x.dtype)(rows[0])[None].copy()
+        else:
+            block = max(1, PLAN_SAMPLES // n)
+            plan = self._plan((block, n), x.dtype)
+            result = np.empty((len(rows), n // 2 + 1), dtype=plan.output_array.dtype)
+            for start in range(0, len(rows), block):
+                chunk = rows[start:start + block]
+                if len(chunk) < block:
+                    plan.input_array[:len(chunk)] = chunk
+                    plan.input_array[len(chunk):] = 0
+                    result[start:] = plan()[:len(chunk)]
+                else:
+                    result[start:start + block] = plan(chunk)
+        result = np.moveaxis(result.reshape(x.shape[:-1] + (n // 2 + 1,)), -1, axis)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+
+_BACKENDS = {
+    'numpy': NumpyBackend,
+    'scipy': ScipyBackend,
+    'pyfftw': PyFFTWBackend,
+}
+_ACTIVE = {}
+
+
+def _numpy_rfft_has_out():
+    import inspect
+    return 'out' in inspect.signature(np.fft.rfft).parameters
+
+
+def get_backend(name=None, workers=WORKERS):
+    """Return the shared FFT backend, picking one on the first call.
+
+    Falls back down PREFERENCE (ending at numpy) when a library is missing.
+    """
+    name = name or os.environ.get('FFT_BACKEND')
+    key = (name, workers)
+    backend = _ACTIVE.get(key)
+    if backend is not None:
+        return backend
+
+    candidates = (name,) + tuple(c for c in PREFERENCE if c != name) if name else PREFERENCE
+    for candidate in candidates:
+        try:
+            backend = _BACKENDS[candidate](workers=workers)
+            break
+        except (ImportError, KeyError):
+            if candidate == name:
+                print(f"FFT backend '{name}' not available, falling back")
+    print(f"FFT backend: {backend.name} (workers={backend.workers})")
+    _ACTIVE[key] = backend
+    return backend
+
+
+def get_realtime_backend():
+    """Backend for small per-frame transforms into preallocated buffers.
+
+    numpy's rfft writes straight into `out=` (numpy >= 2.0), so the render
+    loop allocates nothing; scipy and pyFFTW return a new array that is
+    then copied. At these sizes (a few thousand samples) the faster
+    libraries gain little, so numpy wins here unless FFT_BACKEND says
+    otherwise or this numpy has no `out=`.
+    """
+    if os.environ.get('FFT_BACKEND') or not _numpy_rfft_has_out():
+        return get_backend()
+    return get_backend('numpy', workers=1)
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+# --- TRIG TABLE CACHE ---
+_TABLES = {}
+
+
+def ring_table(n):
+    """(angles, cos, sin) for n evenly spaced vertices, built once per n.
+
+    Same angles the reactors' loops used: 2 * pi * i / n. Read-only, so
+    they can be shared by every ring that has n vertices.
+    """
+    table = _TABLES.get(n)
+    if table is None:
+        angles = 2 * np.pi * np.arange(n) / n
+        table = (angles, np.cos(angles), np.sin(angles))
+        for array in table:
+            array.flags.writeable = False
+        _TABLES[n] = table
+    return table
+
+
+def ring_points(center_x, center_y, radius, n, rotation=0.0, lobes=0.0, morph=0.0,
+                twist=None, ghost_scale=None, ghost_offset=None):
+    """Vertices of a reactive ring / polygon as an (n, 2) float array.
+
+    Vertex i sits at angle a = 2*pi*i/n + rotation (+ twist[i]) and radius
+    radius[i] + sin(a * lobes) * morph, i.e. everything the per-vertex
+    loops in the reactors did:
+
+    - radius: scalar or per-vertex array (e.g. RADIUS + levels * 50)
+    - lobes / morph: polygon shape; 0 morph is a plain circle
+    - twist: optional per-vertex angle distortion
+    - ghost_scale / ghost_offset: also return an echo line, scaled about the
+      centre (e.g. 1.05) and/or shifted by (dx, dy), as (points, ghost)
+
+    With no twist the rotation is applied to the cached cos/sin tables by
+    angle addition, so the only per-frame trig is the lobe morph (if any).
+    Pass `points.tolist()` to pygame.draw.lines.
+    """
+    angles, cos, sin = ring_table(n)
+    r = np.empty(n)
+    r[:] = radius
+    if morph:
+        r += np.sin((angles + rotation) * lobes) * morph
+
+    points = np.empty((n, 2))
+    if twist is None:
+        c, s = math.cos(rotation), math.sin(rotation)
+        np.multiply(cos, c, out=points[:, 0])
+        points[:, 0] -= sin * s
+        np.multiply(sin, c, out=points[:, 1])
+        points[:, 1] += cos * s
+    else:
+        a = angles + rotation + twist
+        np.cos(a, out=points[:, 0])
+        np.sin(a, out=points[:, 1])
+    points *= r[:, None]
+    points += (center_x, center_y)
+
+    if ghost_scale is None and ghost_offset is None:
+        return points
+    ghost = points.copy()
+    if ghost_scale is not None:
+        # center + (p - center) * scale
+        ghost *= ghost_scale
+        ghost += ((1 - ghost_scale) * center_x, (1 - ghost_scale) * center_y)
+    if ghost_offset is not None:
+        ghost += ghost_offset
+    return points, ghost
+
+
+def index_sines(n):
+    """sin(i) for i in range(n), cached: V11's per-vertex 'glitch' twist."""
+    key = ('index_sines', n)
+    table = _TABLES.get(key)
+    if table is None:
+        table = np.sin(np.arange(n, dtype=np.float64))
+        table.flags.writeable = False
+        _TABLES[key] = table
+    return table
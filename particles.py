@@ -0,0 +1,161 @@
+import numpy as np
+import pygame
+
+
+class ParticleField:
+    """The reactors' orbiting "atom" particles, stored as arrays instead of objects.
+
+    Angle, distance, size, speed and colour index live in one contiguous
+    NumPy array each, and a frame of physics is a handful of vectorised
+    operations over all of them, so the particle count can go from a few
+    hundred to tens of thousands.
+
+    The physics is the one V5-V13 share, with each version's numbers as
+    parameters (defaults are V9's):
+
+    - dead zone: below `dead_zone` bass nothing moves
+    - orbit: angle += speed * (1 + spin / (dist + 1)) * spin_scale
+    - implosion: above `pull_threshold` dist -= bass * pull, else dist += drift
+    - core bounce: inside `core` they are thrown back out by `bounce` px
+      (random) and their angle jitters by up to `jitter`
+    - limit: dist is clamped to `limit`
+
+    Colours: `cool` while drifting out; while pulled in, the first
+    (threshold, colour) in `heat` with bass > threshold (unchanged if none
+    match); `spark` on a core bounce (unchanged if None).
+    """
+
+    def __init__(self, count, radius, cool, spread=10, size=(2, 4), speed=(0.01, 0.03),
+                 spin=100, spin_scale=1.0, dead_zone=0.05, pull_threshold=0.3, pull=12, drift=2,
+                 core=90, bounce=(10, 50), jitter=0.1, limit=None, heat=(), spark=None):
+        self.count = count
+        self.spin = spin
+        self.spin_scale = spin_scale
+        self.dead_zone = dead_zone
+        self.pull_threshold = pull_threshold
+        self.pull = pull
+        self.drift = drift
+        self.core = core
+        self.bounce = bounce
+        self.jitter = jitter
+        self.limit = radius + 40 if limit is None else limit
+
+        # Every colour the field can use, referenced by index
+        colors = [cool] + [color for _, color in heat] + ([spark] if spark is not None else [])
+        self.palette = np.array(colors, dtype=np.uint8)
+        self.heat = [(threshold, 1 + i) for i, (threshold, _) in enumerate(heat)]
+        self.spark = len(colors) - 1 if spark is not None else None
+
+        self.angle = np.random.uniform(0, 2 * np.pi, count).astype(np.float32)
+        self.dist = np.random.uniform(radius - spread, radius + spread, count).astype(np.float32)
+        self.size = np.random.uniform(size[0], size[1], count).astype(np.float32)
+        self.speed = np.random.uniform(speed[0], speed[1], count).astype(np.float32)
+        self.color = np.zeros(count, dtype=np.intp)
+        self._scratch = np.empty(count, dtype=np.float32)
+
+    def update(self, bass_energy):
+        """One frame of physics for every particle."""
+        if bass_energy < self.dead_zone:
+            return
+
+        # 1. ORBIT: faster when closer to the centre
+        boost = self._scratch
+        np.add(self.dist, 1, out=boost)
+        np.divide(self.spin, boost, out=boost)
+        boost += 1
+        boost *= self.speed
+        if self.spin_scale != 1.0:
+            boost *= self.spin_scale
+        self.angle += boost
+
+        # 2. IMPLOSION: the whole field moves together, so one branch for all
+        if bass_energy > self.pull_threshold:
+            self.dist -= bass_energy * self.pull
+            for threshold, index in self.heat:
+                if bass_energy > threshold:
+                    self.color.fill(index)
+                    break
+        else:
+            self.dist += self.drift
+            self.color.fill(0)
+
+        # 3. CORE BOUNCE: only the particles that crossed the core
+        hit = np.flatnonzero(self.dist < self.core)
+        if len(hit):
+            self.dist[hit] = self.core + np.random.uniform(self.bounce[0], self.bounce[1], len(hit))
+            if self.jitter:
+                self.angle[hit] += np.random.uniform(-self.jitter, self.jitter, len(hit))
+            if self.spark is not None:
+                self.color[hit] = self.spark
+
+        # 4. LIMITS
+        np.minimum(self.dist, self.limit, out=self.dist)
+
+    def positions(self, center_x, center_y):
+        """(x, y) int arrays of every particle's screen position."""
+        x = np.cos(self.angle)
+        x *= self.dist
+        x += center_x
+        y = np.sin(self.angle)
+        y *= self.dist
+        y += center_y
+        return x.astype(np.intp), y.astype(np.intp)
+
+    def draw(self, surface, center_x, center_y, core_color=None):
+        """Draw every particle as a circle (plus a smaller core circle if given); returns the Rect drawn.
+
+        Same pixels as pygame.draw.circle per particle, but each (colour,
+        radius, core) combination is rendered once into a cached sprite and
+        the whole field goes out in a single Surface.blits call. With a core
+        colour, each core is drawn together with its own orb, so overlapping
+        orbs now hide each other's cores.
+        """
+        x, y = self.positions(center_x, center_y)
+        radius = self.size.astype(np.intp)
+        core = np.maximum(1, (self.size * 0.4).astype(np.intp)) if core_color is not None else np.zeros_like(radius)
+
+        # One small integer per distinct look, then one sprite per distinct key
+        span = int(radius.max()) + 1
+        keys = (self.color * span + radius) * span + core
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sprites = []
+        for key in unique.tolist():
+            rest, core_r = divmod(key, span)
+            color, r = divmod(rest, span)
+            sprites.append(circle_sprite(tuple(self.palette[color].tolist()), r,
+                                         core_color, core_r if core_color is not None else 0))
+
+        x -= radius
+        y -= radius
+        surface.blits(zip(map(sprites.__getitem__, inverse.ravel().tolist()), zip(x.tolist(), y.tolist())),
+                      doreturn=False)
+        # Bounding rect of everything drawn, like pygame.draw.* returns
+        left, top = int(x.min()), int(y.min())
+        return pygame.Rect(left, top, int((x + 2 * radius).max()) - left, int((y + 2 * radius).max()) - top)
+
+
+# --- SPRITE CACHE ---
+_SPRITES = {}
+
+
+def circle_sprite(color, radius, core_color=None, core_radius=0):
+    """Cached colorkeyed sprite of a filled circle, (2 * radius) px square.
+
+    Blitted at (x - radius, y - radius) it covers the same pixels as
+    pygame.draw.circle(surface, color, (x, y), radius).
+    """
+    key = (color, radius, core_color, core_radius)
+    sprite = _SPRITES.get(key)
+    if sprite is None:
+        side = max(2 * radius, 1)
+        colorkey = (0, 0, 0) if (0, 0, 0) not in (color, core_color) else (255, 0, 255)
+        sprite = pygame.Surface((side, side))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()  # Display pixel format blits fastest
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        if core_color is not None:
+            pygame.draw.circle(sprite, core_color, (radius, radius), core_radius)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        _SPRITES[key] = sprite
+    return sprite
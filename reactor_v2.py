@@ -1,5 +1,8 @@
 import numpy as np
-import pyaudio
+from audio_capture import AudioCapture
+from spectrum_engine import SpectrumEngine
+from stft import STFTScheduler
+from compositor import Compositor
 import pygame
 import math
 
@@ -11,46 +14,22 @@ RATE = 44100
 BARS = 120                  # Number of "Spikes"
 RADIUS = 120                # Size of the center circle
 
-# --- SETUP PYAUDIO ---
-p = pyaudio.PyAudio()
-stream = p.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, frames_per_buffer=CHUNK)
+# --- SETUP AUDIO CAPTURE ---
+capture = AudioCapture(rate=RATE, chunk=CHUNK)
+engine = SpectrumEngine(size=CHUNK, bars=BARS)
+scheduler = STFTScheduler(capture.ring, engine, rate=RATE)
 
 # --- SETUP PYGAME ---
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Geometric Reactor V2 (High Performance)")
 clock = pygame.time.Clock()
+compositor = Compositor(screen, (10, 10, 15)) # Dark background, redrawn every frame (no trails)
 
 # --- SMOOTHING VARIABLES ---
 # This array remembers how tall every bar was in the LAST frame
 prev_heights = np.zeros(BARS) 
 
-def get_audio_data():
-    """Captures audio and returns frequency magnitude."""
-    try:
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        data_int = np.frombuffer(data, dtype=np.int16)
-        
-        # Window function prevents "spectral leakage" (cleanup)
-        window = np.hanning(len(data_int))
-        data_int = data_int * window
-        
-        # FFT (The math you already know)
-        fft_data = np.abs(np.fft.rfft(data_int))
-        
-        # Convert to Decibels
-        fft_data = 20 * np.log10(fft_data + 1e-10)
-        
-        # Focus on the music frequencies (Bass/Mids), ignore high hiss
-        fft_data = fft_data[:BARS] 
-        
-        # Normalization (Scale roughly 0 to 1)
-        fft_data = np.clip((fft_data - 30) / 100, 0, 1) 
-        
-        return fft_data
-    except:
-        return np.zeros(BARS)
-
 # --- MAIN LOOP ---
 running = True
 while running:
@@ -60,7 +39,7 @@ while running:
             running = False
 
     # 2. Get Audio Data
-    audio_levels = get_audio_data()
+    audio_levels = scheduler.update()
     
     # 3. PHYSICS ENGINE (Gravity)
     # This is what fixes the "childish" jerky movement.
@@ -69,7 +48,7 @@ while running:
     prev_heights = prev_heights * 0.6 + audio_levels * 0.4
     
     # 4. Draw Everything
-    screen.fill((10, 10, 15)) # Dark background
+    compositor.fade_trails() # Clear what the last frame drew
     center_x, center_y = WIDTH // 2, HEIGHT // 2
     
     for i in range(BARS):
@@ -93,7 +72,7 @@ while running:
         color = (intensity, 50, 255 - intensity)
         
         # Draw the line
-        pygame.draw.line(screen, color, (start_x, start_y), (end_x, end_y), 4)
+        compositor.touch(pygame.draw.line(screen, color, (start_x, start_y), (end_x, end_y), 4))
 
     # 5. The "Thumping" Bass Circle
     # We take the average of the first 5 bars (Deep Bass) to pulse the center
@@ -101,16 +80,14 @@ while running:
     pulse_size = RADIUS + (bass_energy * 30)
     
     # Draw the center circle
-    pygame.draw.circle(screen, (20, 20, 40), (center_x, center_y), int(pulse_size))
+    compositor.touch(pygame.draw.circle(screen, (20, 20, 40), (center_x, center_y), int(pulse_size)))
     # Draw a thin glowing ring around it
-    pygame.draw.circle(screen, (50, 50, 255), (center_x, center_y), int(pulse_size), 2)
+    compositor.touch(pygame.draw.circle(screen, (50, 50, 255), (center_x, center_y), int(pulse_size), 2))
     
     # Update Display
-    pygame.display.flip()
+    compositor.present()
     clock.tick(FPS)
 
 # Quit properly
-stream.stop_stream()
-stream.close()
-p.terminate()
+capture.close()
 pygame.quit()
\ No newline at end of file
@@ -1,5 +1,9 @@
 import numpy as np
-import pyaudio
+from audio_capture import AudioCapture
+from spectrum_engine import SpectrumEngine
+from stft import STFTScheduler
+from compositor import Compositor
+from geometry import ring_points
 import pygame
 import math
 import random
@@ -17,15 +21,17 @@ CYAN = (0, 255, 255)
 PURPLE = (180, 50, 255)
 DEEP_BLUE = (10, 10, 30)
 
-# --- SETUP PYAUDIO ---
-p = pyaudio.PyAudio()
-stream = p.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, frames_per_buffer=CHUNK)
+# --- SETUP AUDIO CAPTURE ---
+capture = AudioCapture(rate=RATE, chunk=CHUNK)
+engine = SpectrumEngine(size=CHUNK, bars=BARS)
+scheduler = STFTScheduler(capture.ring, engine, rate=RATE)
 
 # --- SETUP PYGAME ---
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("V3: Vortex Blob Reactor")
 clock = pygame.time.Clock()
+compositor = Compositor(screen, DEEP_BLUE, fade_alpha=30) # 30/255 transparency -> creates "trails"
 
 # --- PARTICLE SYSTEM ---
 class Particle:
@@ -57,7 +63,7 @@ class Particle:
     def draw(self, surface, center_x, center_y):
         x = center_x + math.cos(self.angle) * self.dist
         y = center_y + math.sin(self.angle) * self.dist
-        pygame.draw.circle(surface, self.color, (int(x), int(y)), int(self.size))
+        return pygame.draw.circle(surface, self.color, (int(x), int(y)), int(self.size))
 
 # Create a swarm of 100 particles
 particles = [Particle() for _ in range(100)]
@@ -66,20 +72,6 @@ particles = [Particle() for _ in range(100)]
 prev_heights = np.zeros(BARS)
 global_rotation = 0 # To spin the whole blob
 
-def get_audio_data():
-    try:
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        data_int = np.frombuffer(data, dtype=np.int16)
-        window = np.hanning(len(data_int))
-        data_int = data_int * window
-        fft_data = np.abs(np.fft.rfft(data_int))
-        fft_data = 20 * np.log10(fft_data + 1e-10)
-        fft_data = fft_data[:BARS] 
-        fft_data = np.clip((fft_data - 30) / 100, 0, 1) 
-        return fft_data
-    except:
-        return np.zeros(BARS)
-
 # --- MAIN LOOP ---
 running = True
 while running:
@@ -88,7 +80,7 @@ while running:
             running = False
 
     # 1. Get Audio
-    audio_levels = get_audio_data()
+    audio_levels = scheduler.update()
     # Smooth the movement
     prev_heights = prev_heights * 0.5 + audio_levels * 0.5
     
@@ -97,45 +89,33 @@ while running:
 
     # 2. Draw Background
     # Create a trailing effect (semi-transparent fill)
-    fade_surface = pygame.Surface((WIDTH, HEIGHT))
-    fade_surface.set_alpha(30) # 30/255 transparency -> creates "trails"
-    fade_surface.fill(DEEP_BLUE)
-    screen.blit(fade_surface, (0,0))
+    compositor.fade_trails()
     
     center_x, center_y = WIDTH // 2, HEIGHT // 2
     
     # 3. Update & Draw Particles (The Vortex)
     for p in particles:
         p.update(bass_energy)
-        p.draw(screen, center_x, center_y)
+        compositor.touch(p.draw(screen, center_x, center_y))
 
     # 4. Draw The Shapeless Line (The Blob)
-    points = []
     global_rotation += 0.01 + (bass_energy * 0.05) # Spin faster when loud
     
-    for i in range(BARS):
-        # Distribute points around the circle
-        angle = (2 * math.pi * i) / BARS + global_rotation
-        
-        # Calculate dynamic radius
-        # Base Radius + (Audio Volume * Scale)
-        r = RADIUS + (prev_heights[i] * 150)
-        
-        # Polar to Cartesian conversion
-        x = center_x + math.cos(angle) * r
-        y = center_y + math.sin(angle) * r
-        points.append((x, y))
+    # Distribute points around the circle
+    # Dynamic radius: Base Radius + (Audio Volume * Scale), all vertices at once
+    # The second (shifted) line is for a "Neon" effect
+    points, neon_points = ring_points(center_x, center_y, RADIUS + prev_heights * 150, BARS,
+                                      rotation=global_rotation, ghost_offset=(5, 5))
 
     # Connect the dots to form a closed loop
     if len(points) > 2:
-        pygame.draw.lines(screen, CYAN, True, points, 3) # True = Closed loop
+        compositor.touch(pygame.draw.lines(screen, CYAN, True, points.tolist(), 3)) # True = Closed loop
         
         # Optional: Draw a second mirrored line for "Neon" effect
-        pygame.draw.lines(screen, PURPLE, True, [(x+5, y+5) for x,y in points], 1)
+        compositor.touch(pygame.draw.lines(screen, PURPLE, True, neon_points.tolist(), 1))
 
-    pygame.display.flip()
+    compositor.present()
     clock.tick(FPS)
 
-stream.stop_stream()
-stream.close()
+capture.close()
 pygame.quit()
\ No newline at end of file
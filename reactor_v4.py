@@ -1,5 +1,9 @@
 import numpy as np
-import pyaudio
+from audio_capture import AudioCapture
+from spectrum_engine import SpectrumEngine
+from stft import STFTScheduler
+from compositor import Compositor
+from geometry import ring_points
 import pygame
 import math
 import random
@@ -19,13 +23,15 @@ WHITE = (255, 255, 255)
 RED = (255, 50, 50)
 
 # --- SETUP AUDIO & SCREEN ---
-p = pyaudio.PyAudio()
-stream = p.open(format=pyaudio.paInt16, channels=1, rate=RATE, input=True, frames_per_buffer=CHUNK)
+capture = AudioCapture(rate=RATE, chunk=CHUNK)
+engine = SpectrumEngine(size=CHUNK, bars=BARS)
+scheduler = STFTScheduler(capture.ring, engine, rate=RATE)
 
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("V4: Reactive Chaos Vortex")
 clock = pygame.time.Clock()
+compositor = Compositor(screen, (0, 0, 0), fade_alpha=40) # Pure black for high contrast
 
 # --- PARTICLE CLASS ---
 class Particle:
@@ -75,26 +81,12 @@ class Particle:
         final_x = x + jx
         final_y = y + jy
         
-        pygame.draw.circle(surface, self.color, (int(final_x), int(final_y)), int(self.size))
+        return pygame.draw.circle(surface, self.color, (int(final_x), int(final_y)), int(self.size))
 
 # Create 150 particles
 particles = [Particle() for _ in range(150)]
 prev_audio = np.zeros(BARS)
 
-def get_audio_data():
-    try:
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        data_int = np.frombuffer(data, dtype=np.int16)
-        window = np.hanning(len(data_int))
-        data_int = data_int * window
-        fft_data = np.abs(np.fft.rfft(data_int))
-        fft_data = 20 * np.log10(fft_data + 1e-10)
-        fft_data = fft_data[:BARS] 
-        fft_data = np.clip((fft_data - 30) / 100, 0, 1) 
-        return fft_data
-    except:
-        return np.zeros(BARS)
-
 # --- MAIN LOOP ---
 running = True
 while running:
@@ -103,7 +95,7 @@ while running:
             running = False
 
     # 1. Analyze Audio
-    audio = get_audio_data()
+    audio = scheduler.update()
     # Smooth it out
     prev_audio = prev_audio * 0.7 + audio * 0.3
     
@@ -112,44 +104,33 @@ while running:
     treble_energy = np.mean(prev_audio[80:]) # High frequencies (80+)
 
     # 2. Draw Background (Dark void)
-    fade = pygame.Surface((WIDTH, HEIGHT))
-    fade.set_alpha(40) 
-    fade.fill((0, 0, 0)) # Pure black for high contrast
-    screen.blit(fade, (0,0))
+    compositor.fade_trails()
     
     center_x, center_y = WIDTH // 2, HEIGHT // 2
     
     # 3. Update Particles
     for p in particles:
         jx, jy = p.update(bass_energy, treble_energy)
-        p.draw(screen, center_x, center_y, jx, jy)
+        compositor.touch(p.draw(screen, center_x, center_y, jx, jy))
 
     # 4. Draw The "Shapeless Line" (Blob)
     # The blob also rotates with the bass now
-    points = []
     rotation_offset = pygame.time.get_ticks() / 1000 * (0.5 + bass_energy)
     
-    for i in range(BARS):
-        angle = (2 * math.pi * i) / BARS + rotation_offset
-        
-        # Radius reacts to audio + random wobble for "shapeless" look
-        r = RADIUS + (prev_audio[i] * 120)
-        
-        x = center_x + math.cos(angle) * r
-        y = center_y + math.sin(angle) * r
-        points.append((x, y))
+    # Radius reacts to audio + random wobble for "shapeless" look
+    # The "Glow" line is the same ring, slightly larger
+    points, glow_points = ring_points(center_x, center_y, RADIUS + prev_audio * 120, BARS,
+                                      rotation=rotation_offset, ghost_scale=1.05)
 
     if len(points) > 2:
         # Draw the main line
-        pygame.draw.lines(screen, CYAN, True, points, 2)
+        compositor.touch(pygame.draw.lines(screen, CYAN, True, points.tolist(), 2))
         
         # Draw a "Glow" line (slightly larger, thinner)
-        glow_points = [(center_x + (x-center_x)*1.05, center_y + (y-center_y)*1.05) for x,y in points]
-        pygame.draw.lines(screen, (50, 50, 100), True, glow_points, 1)
+        compositor.touch(pygame.draw.lines(screen, (50, 50, 100), True, glow_points.tolist(), 1))
 
-    pygame.display.flip()
+    compositor.present()
     clock.tick(FPS)
 
-stream.stop_stream()
-stream.close()
+capture.close()
 pygame.quit()
\ No newline at end of file
@@ -1,24 +1,17 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pyaudio
+from audio_capture import AudioCapture
+from spectrum_engine import SpectrumEngine
 import struct
 
 # --- CONFIGURATION ---
 CHUNK = 1024 * 2             # How many audio samples to read at a time (Buffer size)
-FORMAT = pyaudio.paInt16     # Audio format (16-bit)
 CHANNELS = 1                 # Mono audio
 RATE = 44100                 # Sampling rate (Hz)
 
-# --- SETUP PYAUDIO ---
-p = pyaudio.PyAudio()
-
-stream = p.open(
-    format=FORMAT,
-    channels=CHANNELS,
-    rate=RATE,
-    input=True,
-    frames_per_buffer=CHUNK
-)
+# --- SETUP AUDIO CAPTURE ---
+capture = AudioCapture(rate=RATE, chunk=CHUNK, channels=CHANNELS)
+engine = SpectrumEngine(size=CHUNK)
 
 # --- SETUP PLOT ---
 fig, ax = plt.subplots(figsize=(10, 6))
@@ -38,16 +31,11 @@ print("Stream started... Play some music!")
 # --- THE MAIN LOOP ---
 try:
     while True:
-        # 1. Read binary data
-        data = stream.read(CHUNK, exception_on_overflow=False)
-        data_int = np.frombuffer(data, dtype=np.int16)
+        # 1. Grab the newest samples (never blocks)
+        data_int = capture.latest(CHUNK, out=engine.samples)
         
-        # 2. Compute FFT
-        windowed_data = data_int * np.hanning(len(data_int))
-        fft_data = np.abs(np.fft.rfft(windowed_data)) 
-
-        # 3. Convert to dB
-        fft_data_log = 20 * np.log10(fft_data + 1e-10)
+        # 2. Compute FFT + convert to dB (Hanning window, reused buffers)
+        fft_data_log = engine.decibels(data_int)
 
         # --- THE NOISE GATE (NEW) ---
         # Adjust this number! If the "dancing" is still there, make this 60 or 70.
@@ -69,6 +57,4 @@ try:
 
 except KeyboardInterrupt:
     print("\nStopping...")
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
\ No newline at end of file
+    capture.close()
\ No newline at end of file
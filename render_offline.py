@@ -0,0 +1,266 @@
+import argparse
+import os
+import random
+import runpy
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- CONFIGURATION ---
+FPS = 60                    # Simulated frame rate of the render
+SEED = 0                    # Seeds `random` / np.random so renders repeat exactly
+MAX_IN_FLIGHT = 32          # PNG frames queued for the encoder pool before we wait
+
+# No window and no sound device: must be set before pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+import audio_capture  # noqa: E402
+from audio_capture import RingBuffer  # noqa: E402
+from spectrogram_image import write_png  # noqa: E402
+from wav_reader import WavFile  # noqa: E402
+
+
+class _Finished(Exception):
+    """Raised from the patched display flip once the audio has run out."""
+
+
+# --- FAKE AUDIO + CLOCK ---
+class WavSource:
+    """Stands in for AudioCapture: feeds a WAV into the ring one frame at a time.
+
+    Instead of a device thread, the render loop calls `advance()` after every
+    frame, which writes exactly the samples that belong to the next
+    1 / FPS seconds. The reactor's STFTScheduler then sees the same stream
+    it would see live, just not at wall-clock speed.
+    """
+
+    def __init__(self, path, fps=FPS, seconds=None):
+        self.wav = WavFile(path)
+        self.rate = self.wav.rate
+        self.fps = fps
+        self.total = self.wav.n_samples
+        if seconds is not None:
+            self.total = min(self.total, int(seconds * self.rate))
+        self.frame = 0
+        self.position = 0
+        self.ring = None
+        self.overflows = 0
+
+    def __call__(self, rate=None, chunk=None, channels=1, seconds=4):
+        # Called by the reactor in place of AudioCapture(rate=..., chunk=...)
+        if rate is not None and rate != self.rate:
+            print(f"Note: reactor expects {rate} Hz, file is {self.rate} Hz")
+        self.ring = RingBuffer(self.rate * seconds, channels=channels)
+        self.channels = channels
+        self.advance()
+        return self
+
+    @property
+    def frames_total(self):
+        return -(-self.total * self.fps // self.rate)
+
+    def advance(self):
+        """Write the audio for the next frame; False once the file is used up."""
+        if self.position >= self.total:
+            return False
+        self.frame += 1
+        stop = min(self.total, self.frame * self.rate // self.fps)
+        block = self.wav.to_float(self.wav.data[self.position:stop])
+        if self.channels == 1:
+            block = block.mean(axis=1) if self.wav.channels > 1 else block[:, 0]
+        block *= 32767 / self.wav.full_scale  # to_float() keeps the file's own scale
+        np.clip(block, -32768, 32767, out=block)
+        self.ring.write(block.astype(np.int16))
+        self.position = stop
+        return True
+
+    def latest(self, n, out=None):
+        return self.ring.latest(n, out=out)
+
+    def close(self):
+        pass
+
+
+class SimulatedClock:
+    """pygame.time.Clock that never sleeps: every tick is exactly 1 / FPS."""
+
+    def __init__(self, fps=FPS):
+        self.fps = fps
+
+    def tick(self, framerate=0):
+        return 1000 // self.fps
+
+    def get_fps(self):
+        return float(self.fps)
+
+
+# --- FRAME SINKS ---
+def grab(screen):
+    """(pixel bytes, ffmpeg pix_fmt) of the screen, without conversion if possible.
+
+    The usual 32-bit XRGB display surface is copied out as is ('bgr0' in
+    ffmpeg's terms), which is ~10x cheaper than converting every frame to
+    RGB on the render thread; anything else falls back to rgb24.
+    """
+    width, _ = screen.get_size()
+    if (screen.get_bitsize() == 32 and screen.get_masks() == (0xFF0000, 0xFF00, 0xFF, 0)
+            and screen.get_pitch() == width * 4):
+        return screen.get_buffer().raw, 'bgr0'
+    return pygame.image.tobytes(screen, 'RGB'), 'rgb24'
+
+
+def _to_rgb(pixels, pix_fmt, width, height):
+    frame = np.frombuffer(pixels, dtype=np.uint8)
+    if pix_fmt == 'bgr0':
+        return frame.reshape(height, width, 4)[:, :, 2::-1]
+    return frame.reshape(height, width, 3)
+
+
+class RawSink:
+    """All frames back to back, as grabbed (ffmpeg: -f rawvideo -pix_fmt <pix_fmt>)."""
+
+    def __init__(self, path, width, height, fps, pix_fmt):
+        self.file = open(path, 'wb')
+        print(f"Raw frames: ffmpeg -f rawvideo -pix_fmt {pix_fmt} -s {width}x{height} -r {fps} -i {path} ...")
+
+    def write(self, index, pixels):
+        self.file.write(pixels)
+
+    def close(self):
+        self.file.close()
+
+
+def _encode_png(path, pixels, pix_fmt, width, height):
+    write_png(path, _to_rgb(pixels, pix_fmt, width, height))
+
+
+class PngSink:
+    """frame_000000.png, ... converted and encoded by a process pool, in parallel."""
+
+    def __init__(self, out_dir, width, height, pix_fmt, workers=None):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.format = (pix_fmt, width, height)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.pending = []
+
+    def write(self, index, pixels):
+        path = os.path.join(self.out_dir, f"frame_{index:06d}.png")
+        self.pending.append(self.pool.submit(_encode_png, path, pixels, *self.format))
+        if len(self.pending) >= MAX_IN_FLIGHT:
+            self.pending.pop(0).result()  # Keep memory bounded
+
+    def close(self):
+        for future in self.pending:
+            future.result()
+        self.pool.shutdown()
+
+
+class FfmpegSink:
+    """Pipe raw frames into ffmpeg and mux the WAV in as the soundtrack."""
+
+    def __init__(self, path, width, height, fps, pix_fmt, wav_path):
+        self.proc = subprocess.Popen(
+            ['ffmpeg', '-y', '-loglevel', 'error',
+             '-f', 'rawvideo', '-pix_fmt', pix_fmt, '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             '-i', wav_path, '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-shortest', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, index, pixels):
+        self.proc.stdin.write(pixels)
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+# --- RENDER ---
+def render(script, wav_path, out, fmt='raw', fps=FPS, seconds=None, workers=None, seed=SEED):
+    """Run a reactor script against a WAV, headless, and save every frame.
+
+    The script runs unmodified: AudioCapture, pygame.time.Clock/get_ticks and
+    pygame.display.flip/update are swapped out for the duration of the run.
+    Each flip grabs the screen, hands it to the sink and feeds the next
+    frame's audio; when the audio runs out the run stops. Returns the
+    number of frames written.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    source = WavSource(wav_path, fps, seconds)
+    state = {'frames': 0, 'sink': None}
+
+    def present(*args):
+        screen = pygame.display.get_surface()
+        pixels, pix_fmt = grab(screen)
+        if state['sink'] is None:
+            width, height = screen.get_size()
+            if fmt == 'png':
+                state['sink'] = PngSink(out, width, height, pix_fmt, workers)
+            elif fmt == 'mp4':
+                state['sink'] = FfmpegSink(out, width, height, fps, pix_fmt, wav_path)
+            else:
+                state['sink'] = RawSink(out, width, height, fps, pix_fmt)
+            print(f"Rendering {source.frames_total} frames at {width}x{height}, {fps} fps")
+        state['sink'].write(state['frames'], pixels)
+        state['frames'] += 1
+        if not source.advance():
+            raise _Finished
+
+    patches = [
+        (audio_capture, 'AudioCapture', source),
+        (pygame.time, 'Clock', lambda: SimulatedClock(fps)),
+        (pygame.time, 'get_ticks', lambda: state['frames'] * 1000 // fps),
+        (pygame.display, 'flip', present),
+        (pygame.display, 'update', present),
+    ]
+    saved = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+    for obj, name, value in patches:
+        setattr(obj, name, value)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except _Finished:
+        pass
+    finally:
+        for obj, name, value in saved:
+            setattr(obj, name, value)
+        if state['sink'] is not None:
+            state['sink'].close()
+        pygame.quit()
+    return state['frames']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a reactor offline from a WAV file, faster than realtime.")
+    parser.add_argument('script', help="Reactor script, e.g. reactor_v13.py")
+    parser.add_argument('wav')
+    parser.add_argument('out', help="Output raw frame file, PNG directory or .mp4")
+    parser.add_argument('--format', choices=('raw', 'png', 'mp4'), default='raw')
+    parser.add_argument('--fps', type=int, default=FPS)
+    parser.add_argument('--seconds', type=float, help="Only render the first N seconds")
+    parser.add_argument('-j', '--workers', type=int, help="PNG encoder processes (default: all cores)")
+    args = parser.parse_args(argv)
+    if args.format == 'mp4' and shutil.which('ffmpeg') is None:
+        parser.error("--format mp4 needs ffmpeg on the PATH")
+
+    t0 = time.perf_counter()
+    frames = render(args.script, args.wav, args.out, args.format, args.fps, args.seconds, args.workers)
+    elapsed = time.perf_counter() - t0
+    audio = frames / args.fps
+    print(f"{frames} frames ({audio:.1f} s of audio) in {elapsed:.1f} s "
+          f"= {frames / elapsed:.0f} fps, {audio / elapsed:.1f}x realtime")
+    return 0
+
+
+if __name__ == '__main__':
+    # The reactor runs as __main__ too, so go through the importable module
+    # to keep _encode_png picklable for the PNG pool
+    import render_offline
+    raise SystemExit(render_offline.main())
@@ -0,0 +1,297 @@
+import argparse
+import threading
+import time
+import wave
+
+import numpy as np
+
+from audio_capture import RingBuffer
+
+# --- CONFIGURATION ---
+RATE = 44100
+CHUNK = 1024
+BLOCK_FRAMES = 1 << 16      # Samples rendered per block
+NOISE_TABLE = 1 << 20       # Noise loops every ~24 s at 44.1 kHz
+SEED = 0
+
+
+def to_int16(block):
+    """float32 -1..1 -> int16, clipped. Scales `block` in place."""
+    block *= 32767
+    np.clip(block, -32768, 32767, out=block)
+    return block.astype(np.int16)
+
+
+def _tile(table, start, n):
+    # `table` repeated forever; samples start..start+n, copied in slices
+    out = np.empty(n, dtype=np.float32)
+    period = len(table)
+    pos = start % period
+    done = 0
+    while done < n:
+        take = min(n - done, period - pos)
+        out[done:done + take] = table[pos:pos + take]
+        done += take
+        pos = 0
+    return out
+
+
+# --- SIGNALS ---
+class Signal:
+    """A deterministic test signal, defined sample by sample from t = 0.
+
+    Subclasses implement `render(start, n)`: float32 samples start..start+n.
+    Everything is a function of the absolute sample index, so any block can
+    be rendered on its own and block boundaries never show up in the
+    output. Signals mix with + and scale with *.
+    """
+
+    rate = RATE
+
+    def render(self, start, n):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Mix([self, other])
+
+    def __mul__(self, gain):
+        return Mix([self], [gain])
+
+    __rmul__ = __mul__
+
+    def blocks(self, seconds, block_frames=BLOCK_FRAMES, dtype=np.float32):
+        """Yield the first `seconds` of the signal in blocks of float32 or int16."""
+        total = int(round(seconds * self.rate))
+        as_int16 = np.dtype(dtype) == np.int16
+        for start in range(0, total, block_frames):
+            block = self.render(start, min(block_frames, total - start))
+            yield to_int16(block) if as_int16 else block
+
+    def generate(self, seconds, dtype=np.float32):
+        """The first `seconds` of the signal as one array."""
+        out = np.empty(int(round(seconds * self.rate)), dtype=dtype)
+        pos = 0
+        for block in self.blocks(seconds, dtype=dtype):
+            out[pos:pos + len(block)] = block
+            pos += len(block)
+        return out
+
+
+class Tones(Signal):
+    """Sum of sine waves, e.g. Tones([50, 1000], [1.0, 0.5]).
+
+    Each block is one small float32 matmul: sin and cos of every tone over
+    a block are tabulated once, and a block starting at phase p is just
+    sin(p + x) = cos(p) sin(x) + sin(p) cos(x). Only the start phase is
+    computed per block, in float64, so there is no drift even hours in.
+    """
+
+    def __init__(self, freqs, amps=None, rate=RATE):
+        self.rate = rate
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=np.float64))
+        self.amps = np.ones(len(self.freqs)) if amps is None else np.atleast_1d(np.asarray(amps, dtype=np.float64))
+        self._steps = 2 * np.pi * self.freqs / rate
+        x = np.outer(self._steps, np.arange(BLOCK_FRAMES))
+        self._base = np.concatenate((np.sin(x), np.cos(x))).astype(np.float32)
+
+    def render(self, start, n):
+        out = np.empty(n, dtype=np.float32)
+        for pos in range(0, n, BLOCK_FRAMES):
+            m = min(BLOCK_FRAMES, n - pos)
+            phase = np.mod(self._steps * (start + pos), 2 * np.pi)
+            weights = np.concatenate((self.amps * np.cos(phase), self.amps * np.sin(phase)))
+            np.matmul(weights.astype(np.float32), self._base[:, :m], out=out[pos:pos + m])
+        return out
+
+
+class Periodic(Signal):
+    """A signal that repeats a precomputed one-period table."""
+
+    def __init__(self, table, rate=RATE):
+        self.rate = rate
+        self.table = np.asarray(table, dtype=np.float32)
+
+    def render(self, start, n):
+        return _tile(self.table, start, n)
+
+
+class LogSweep(Periodic):
+    """Exponential sine sweep f_start -> f_stop over `seconds`, repeating."""
+
+    def __init__(self, f_start=20.0, f_stop=20000.0, seconds=10.0, amp=0.5, rate=RATE):
+        t = np.arange(int(round(seconds * rate))) / rate
+        lam = seconds / np.log(f_stop / f_start)
+        phase = 2 * np.pi * f_start * lam * np.expm1(t / lam)
+        super().__init__(amp * np.sin(phase), rate)
+
+
+class Noise(Periodic):
+    """White or pink (-3 dB/octave) Gaussian noise at a given RMS level.
+
+    Drawn once from a seeded generator into a NOISE_TABLE-long loop; pink
+    noise is shaped in the frequency domain of that loop, so it wraps
+    around seamlessly.
+    """
+
+    def __init__(self, color='white', rms=0.1, seed=SEED, rate=RATE):
+        noise = np.random.default_rng(seed).standard_normal(NOISE_TABLE)
+        if color == 'pink':
+            spectrum = np.fft.rfft(noise)
+            k = np.arange(len(spectrum), dtype=np.float64)
+            k[0] = np.inf  # No DC
+            spectrum /= np.sqrt(k)
+            noise = np.fft.irfft(spectrum, n=NOISE_TABLE)
+        elif color != 'white':
+            raise ValueError(f"Unknown noise color '{color}'")
+        super().__init__(noise * (rms / noise.std()), rate)
+
+
+class Kicks(Periodic):
+    """Kick-drum hits on every beat: a decaying sine with a fast pitch drop."""
+
+    def __init__(self, bpm=120, f_start=150.0, f_stop=45.0, decay=0.08, amp=0.9, rate=RATE):
+        t = np.arange(int(round(60.0 / bpm * rate))) / rate
+        freq = f_stop + (f_start - f_stop) * np.exp(-t / 0.03)
+        phase = 2 * np.pi * np.cumsum(freq) / rate
+        super().__init__(amp * np.exp(-t / decay) * np.sin(phase), rate)
+
+
+class Mix(Signal):
+    """Weighted sum of signals (all at the same rate)."""
+
+    def __init__(self, signals, gains=None):
+        self.signals = list(signals)
+        self.gains = [1.0] * len(self.signals) if gains is None else list(gains)
+        self.rate = self.signals[0].rate
+        if any(s.rate != self.rate for s in self.signals):
+            raise ValueError("Can't mix signals with different sample rates")
+
+    def __add__(self, other):
+        return Mix(self.signals + [other], self.gains + [1.0])
+
+    def render(self, start, n):
+        out = np.zeros(n, dtype=np.float32)
+        for signal, gain in zip(self.signals, self.gains):
+            block = signal.render(start, n)
+            if gain != 1.0:
+                block *= gain
+            out += block
+        return out
+
+
+class Gate(Signal):
+    """Silence gaps: `on` seconds of the signal, then `off` seconds of zeros, repeating."""
+
+    def __init__(self, signal, on=8.0, off=1.0):
+        self.signal = signal
+        self.rate = signal.rate
+        self._mask = np.zeros(int(round((on + off) * self.rate)), dtype=np.float32)
+        self._mask[:int(round(on * self.rate))] = 1.0
+
+    def render(self, start, n):
+        out = self.signal.render(start, n)
+        out *= _tile(self._mask, start, n)
+        return out
+
+
+# --- FIXTURES ---
+FIXTURES = {
+    'tones': lambda rate: Tones([50, 1000], [1.0, 0.5], rate=rate),
+    'sweep': lambda rate: LogSweep(rate=rate),
+    'white': lambda rate: Noise('white', rate=rate),
+    'pink': lambda rate: Noise('pink', rate=rate),
+    'kicks': lambda rate: Kicks(rate=rate),
+    'music': lambda rate: Gate(Kicks(amp=0.6, rate=rate)
+                               + Tones([110, 220, 330, 440], [0.2, 0.1, 0.07, 0.05], rate=rate)
+                               + Noise('pink', rms=0.05, rate=rate)),
+}
+
+
+def fixture(name, rate=RATE):
+    """One of the named benchmark signals in FIXTURES."""
+    return FIXTURES[name](rate)
+
+
+def write_wav(path, signal, seconds, channels=1, block_frames=BLOCK_FRAMES):
+    """Stream `seconds` of the signal to a 16-bit WAV (same signal on every channel)."""
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(signal.rate)
+        for block in signal.blocks(seconds, block_frames, dtype=np.int16):
+            if channels > 1:
+                block = np.repeat(block[:, None], channels, axis=1)
+            w.writeframes(block.tobytes())
+
+
+# --- LIVE SOURCE ---
+class SignalSource:
+    """Drop-in stand-in for AudioCapture that plays a Signal instead of a mic.
+
+    A background thread writes `chunk`-sized int16 blocks into a RingBuffer
+    at real-time pace, just like the PyAudio callback does, so the reactors
+    and STFTScheduler run unchanged:
+
+        capture = SignalSource(fixture('music'), chunk=CHUNK)
+    """
+
+    def __init__(self, signal, chunk=CHUNK, channels=1, seconds=4):
+        self.signal = signal
+        self.rate = signal.rate
+        self.chunk = chunk
+        self.channels = channels
+        self.ring = RingBuffer(self.rate * seconds, channels=channels)
+        self.overflows = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        started = time.perf_counter()
+        position = 0
+        while self._running:
+            block = to_int16(self.signal.render(position, self.chunk))
+            if self.channels > 1:
+                block = np.repeat(block[:, None], self.channels, axis=1)
+            self.ring.write(block)
+            position += self.chunk
+            delay = started + position / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def latest(self, n, out=None):
+        return self.ring.latest(n, out=out)
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write deterministic test signals to WAV, or time them.")
+    parser.add_argument('out', nargs='?', help="Output .wav")
+    parser.add_argument('--fixture', choices=sorted(FIXTURES), default='music')
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--rate', type=int, default=RATE)
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--bench', action='store_true', help="Time generating an hour of every fixture")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        for name in sorted(FIXTURES):
+            signal = fixture(name, args.rate)
+            t0 = time.perf_counter()
+            for _ in signal.blocks(3600):
+                pass
+            print(f"{name:>6}: 1 h of audio in {time.perf_counter() - t0:.2f} s")
+    elif args.out:
+        write_wav(args.out, fixture(args.fixture, args.rate), args.seconds, args.channels)
+        print(f"Wrote {args.seconds:g} s of '{args.fixture}' to {args.out}")
+    else:
+        parser.error("give an output path or --bench")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
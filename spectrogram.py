@@ -1,30 +1,67 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.io import wavfile
 
-# 1. Load the File
-filename = 'test_audio.wav' 
-sample_rate, data = wavfile.read(filename)
+from tile_pyramid import cached_pyramid
+from wav_reader import WavFile
 
-# 2. Convert to Mono (if stereo)
-if len(data.shape) > 1:
-    data = data.mean(axis=1)
+# --- CONFIGURATION ---
+filename = 'test_audio.wav'
+NFFT = 1024
+NOVERLAP = 512
+STREAMING = False           # True = bounded memory, for multi-hour recordings
+MAX_COLUMNS = 2000          # Streaming mode only draws this many time columns
+FMAX = None                 # Streaming mode: e.g. 1200 decimates first for a finer low-band view
 
-# 3. Create the Spectrogram
-# We don't slice the data this time; we want to see the whole file!
 plt.figure(figsize=(12, 6))
 
-# NFFT = Block size (256, 512, 1024, etc). Smaller = better time resolution, worse freq resolution.
-# Fs = Sampling rate
-# noverlap = How much the blocks overlap (smoothes the image)
-Pxx, freqs, bins, im = plt.specgram(data, NFFT=1024, Fs=sample_rate, noverlap=512, cmap='inferno')
+if STREAMING:
+    # 1. Compute block by block straight to disk (memory stays flat), then
+    # build a zoom pyramid. Both are cached by file content + settings.
+    pyramid = cached_pyramid(filename, nfft=NFFT, noverlap=NOVERLAP, fmax=FMAX)
+
+    # 2. Only pull as many columns off disk as the screen can show
+    ax = plt.gca()
+    t_end = pyramid.column_time(0, len(pyramid.levels[0]) - 1)
+    Pxx, extent = pyramid.view(0, t_end, 0, FMAX or 10000, max_columns=MAX_COLUMNS)
+    im = plt.imshow(10 * np.log10(Pxx.T + 1e-20), origin='lower', aspect='auto',
+                    cmap='inferno', extent=extent)
+    ax.set_autoscale_on(False)
+
+    # 3. Zooming/panning re-fetches just the visible window at the right detail level
+    def refresh(ax):
+        t0, t1 = ax.get_xlim()
+        f0, f1 = ax.get_ylim()
+        Pxx, extent = pyramid.view(t0, t1, f0, f1, max_columns=MAX_COLUMNS)
+        im.set_data(10 * np.log10(Pxx.T + 1e-20))
+        im.set_extent(extent)
+
+    ax.callbacks.connect('xlim_changed', refresh)
+    ax.callbacks.connect('ylim_changed', refresh)
+else:
+    # 1. Open the File (memory-mapped, so mono files are never copied)
+    wav = WavFile(filename)
+    sample_rate = wav.rate
+
+    # 2. Convert to Mono (if stereo)
+    if wav.channels > 1:
+        data = wav.to_float(wav.data).mean(axis=1)
+    else:
+        data = wav.channel(0)
+
+    # 3. Create the Spectrogram
+    # We don't slice the data this time; we want to see the whole file!
+
+    # NFFT = Block size (256, 512, 1024, etc). Smaller = better time resolution, worse freq resolution.
+    # Fs = Sampling rate
+    # noverlap = How much the blocks overlap (smoothes the image)
+    Pxx, freqs, bins, im = plt.specgram(data, NFFT=NFFT, Fs=sample_rate, noverlap=NOVERLAP, cmap='inferno')
 
 plt.title(f"Spectrogram Analysis of {filename}")
 plt.xlabel("Time (seconds)")
 plt.ylabel("Frequency (Hz)")
 
 # Audio is mostly below 10kHz, so let's zoom in on the useful part
-plt.ylim(0, 10000) 
+plt.ylim(0, FMAX or 10000)
 
 plt.colorbar(label="Intensity (dB)")
-plt.show()
\ No newline at end of file
+plt.show()
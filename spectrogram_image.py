@@ -0,0 +1,96 @@
+import struct
+import zlib
+
+import numpy as np
+
+# --- CONFIGURATION ---
+DYNAMIC_RANGE_DB = 80.0     # Default: map [max - 80 dB, max] onto the colormap
+PNG_COMPRESSION = 6
+
+# Inferno sampled at 9 points, used when matplotlib is not installed
+_INFERNO_ANCHORS = np.array([
+    (0, 0, 4), (31, 12, 72), (85, 15, 109), (136, 34, 106), (186, 54, 85),
+    (227, 89, 51), (249, 140, 10), (249, 201, 50), (252, 255, 164),
+], dtype=np.float64)
+
+_LUTS = {}
+
+
+def colormap_lut(name='inferno'):
+    """(256, 3) uint8 lookup table for a colormap, built once per name.
+
+    Pulls the colours from matplotlib's colormap registry when matplotlib is
+    installed (no figure is ever created); otherwise only 'inferno' is
+    available, interpolated from built-in anchor colours.
+    """
+    lut = _LUTS.get(name)
+    if lut is not None:
+        return lut
+    try:
+        from matplotlib import colormaps
+        lut = (colormaps[name](np.linspace(0, 1, 256))[:, :3] * 255 + 0.5).astype(np.uint8)
+    except ImportError:
+        if name != 'inferno':
+            raise ValueError(f"Colormap '{name}' needs matplotlib; only 'inferno' is built in")
+        x = np.linspace(0, 1, len(_INFERNO_ANCHORS))
+        t = np.linspace(0, 1, 256)
+        lut = np.stack([np.interp(t, x, _INFERNO_ANCHORS[:, c]) for c in range(3)], axis=1)
+        lut = (lut + 0.5).astype(np.uint8)
+    _LUTS[name] = lut
+    return lut
+
+
+def log_frequency_rows(freqs, height, f_min=20.0, f_max=None):
+    """Bin index for each output row so rows are log-spaced in frequency."""
+    f_max = f_max or freqs[-1]
+    targets = np.geomspace(max(f_min, freqs[1]), f_max, height)
+    return np.clip(np.searchsorted(freqs, targets), 0, len(freqs) - 1)
+
+
+def to_rgb(pxx, lut=None, vmin=None, vmax=None, rows=None):
+    """(columns, bins) power spectrogram -> (height, width, 3) uint8 image.
+
+    Converts to dB, quantises to 0..255 in place and maps through the LUT
+    with one fancy-indexing gather. Low frequencies end up at the bottom.
+    `rows` (e.g. from log_frequency_rows) picks which bins become rows.
+    """
+    lut = colormap_lut() if lut is None else lut
+    data = np.asarray(pxx if rows is None else pxx[:, rows], dtype=np.float32)
+    db = np.log10(data + 1e-20)
+    db *= 10
+    vmax = float(db.max()) if vmax is None else vmax
+    vmin = vmax - DYNAMIC_RANGE_DB if vmin is None else vmin
+    db -= vmin
+    db *= 255.0 / max(vmax - vmin, 1e-9)
+    np.clip(db, 0, 255, out=db)
+    index = db.astype(np.uint8)
+    return lut[index.T[::-1]]
+
+
+def write_png(path, rgb, compression=PNG_COMPRESSION):
+    """Write an (height, width, 3) uint8 array as an 8-bit RGB PNG."""
+    height, width, _ = rgb.shape
+    raw = np.empty((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 0] = 0  # Filter type 0 (none) on every scanline
+    raw[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(kind, payload):
+        return (struct.pack('>I', len(payload)) + kind + payload
+                + struct.pack('>I', zlib.crc32(kind + payload) & 0xFFFFFFFF))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), compression)))
+        f.write(chunk(b'IEND', b''))
+
+
+def save_spectrogram_png(path, pxx, freqs, f_max=None, log_freq=False, height=None,
+                         cmap='inferno', vmin=None, vmax=None):
+    """Render a (columns, bins) spectrogram straight to PNG, no matplotlib figure."""
+    f_max = f_max or freqs[-1]
+    if log_freq:
+        rows = log_frequency_rows(freqs, height or 512, f_max=f_max)
+    else:
+        rows = np.arange(np.searchsorted(freqs, f_max, side='right'))
+    write_png(path, to_rgb(pxx, colormap_lut(cmap), vmin, vmax, rows))
@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from decimator import STOPBAND_DB, StreamingDecimator, factor_for
+from fft_backend import get_backend
+from spectrum_cache import SpectrumCache
+from spectrum_engine import get_window, mid_side
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+NFFT = 1024                 # Same defaults spectrogram.py hands to plt.specgram
+NOVERLAP = 512
+BLOCK_FRAMES = 1 << 18      # Samples read per block (~6 s at 44.1 kHz)
+
+
+def frame_count(n_samples, nfft=NFFT, noverlap=NOVERLAP):
+    """Number of STFT columns plt.specgram would produce for n_samples."""
+    if n_samples < nfft:
+        return 0
+    return (n_samples - nfft) // (nfft - noverlap) + 1
+
+
+class StreamingSTFT:
+    """Incremental STFT: push audio blocks in, get finished columns out.
+
+    Carries the un-analysed tail of each block over to the next one, so the
+    columns come out exactly as if the whole signal had been transformed in
+    one go. Output is the one-sided PSD with matplotlib's specgram scaling
+    (Pxx), laid out time-major: (columns, nfft // 2 + 1). Multichannel
+    blocks (n, channels) give (channels, columns, bins), with every
+    channel's frames in one batched rfft.
+    """
+
+    def __init__(self, rate, nfft=NFFT, noverlap=NOVERLAP, window='hann', backend=None):
+        self.rate = rate
+        self.nfft = nfft
+        self.hop = nfft - noverlap
+        self.window = get_window(nfft, window)
+        self.fft = backend or get_backend()
+        self.carry = np.zeros(0, dtype=np.float32)
+        self.columns_done = 0
+
+        # |X|^2 -> PSD: one-sided doubling, then / (Fs * sum(w^2))
+        scale = np.full(nfft // 2 + 1, 2.0)
+        scale[0] = 1.0
+        if nfft % 2 == 0:
+            scale[-1] = 1.0
+        self.scale = (scale / (rate * np.sum(self.window.astype(np.float64) ** 2))).astype(np.float32)
+
+    def push(self, block):
+        """Feed float32 samples (n,) or (n, channels); returns the columns now complete."""
+        buf = np.concatenate((self.carry, block)) if len(self.carry) else block
+        count = frame_count(len(buf), self.nfft, self.nfft - self.hop)
+        if count == 0:
+            self.carry = np.array(buf, dtype=np.float32)
+            return np.empty(buf.shape[1:] + (0, self.nfft // 2 + 1), dtype=np.float32)
+
+        frames = sliding_window_view(buf, self.nfft, axis=0)[::self.hop][:count]
+        if buf.ndim == 2:
+            frames = frames.transpose(1, 0, 2)  # (channels, columns, nfft)
+        spectrum = self.fft.rfft(frames * self.window, axis=-1)
+        power = np.abs(spectrum).astype(np.float32)
+        np.square(power, out=power)
+        power *= self.scale
+
+        self.carry = np.array(buf[count * self.hop:], dtype=np.float32)
+        self.columns_done += count
+        return power
+
+    def times(self, first=0, count=None):
+        """Centre time (s) of each column, like the `bins` plt.specgram returns."""
+        count = self.columns_done - first if count is None else count
+        return (first + np.arange(count)) * self.hop / self.rate + self.nfft / 2 / self.rate
+
+    def freqs(self):
+        return np.fft.rfftfreq(self.nfft, d=1.0 / self.rate)
+
+
+def read_blocks(path, block_frames=BLOCK_FRAMES, fmax=None, start=0, stop=None, channels='mean'):
+    """Yield (rate, float32 block) from a WAV without loading it all.
+
+    Blocks are sliced off the memory-mapped file (samples start..stop).
+    channels='mean' averages multichannel audio to a mono (n,) block, like
+    spectrogram.py does; 'all' keeps every channel as (n, channels) and
+    'midside' turns stereo into (n, 2) mid/side.
+
+    With `fmax` set, blocks are first decimated (anti-aliased, streaming)
+    to the lowest rate that still covers 0..fmax, and `rate` is that
+    reduced rate, so everything downstream runs on far fewer samples.
+    """
+    wav = WavFile(path)
+    if channels not in ('mean', 'all', 'midside'):
+        raise ValueError(f"Unknown channel mode '{channels}'")
+    if channels == 'midside' and wav.channels != 2:
+        raise ValueError(f"{path}: mid/side needs a stereo file, got {wav.channels} channels")
+    decimator = StreamingDecimator(factor_for(wav.rate, fmax) if fmax else 1)
+    rate = wav.rate / decimator.factor
+    stop = wav.n_samples if stop is None else min(stop, wav.n_samples)
+    for pos in range(start, stop, block_frames):
+        block = wav.to_float(wav.data[pos:min(pos + block_frames, stop)])
+        if channels == 'midside':
+            block = mid_side(block)
+        elif channels == 'mean':
+            block = block.mean(axis=1) if wav.channels > 1 else block[:, 0]
+        yield rate, decimator.process(block)
+
+
+def analysis_length(wav, fmax=None):
+    """(rate, samples) the analysis sees after optional decimation."""
+    factor = factor_for(wav.rate, fmax) if fmax else 1
+    return wav.rate / factor, -(-wav.n_samples // factor)
+
+
+def stream_spectrogram(path, out_path, nfft=NFFT, noverlap=NOVERLAP,
+                       block_frames=BLOCK_FRAMES, window='hann', fmax=None, backend=None):
+    """Write the spectrogram of a WAV of any length to an .npy on disk.
+
+    Peak memory is a couple of blocks no matter how long the file is: each
+    block's columns go straight into a memory-mapped (columns, bins) array.
+    `fmax` decimates first (see read_blocks), so the same nfft buys finer
+    frequency resolution over just the band you care about.
+    `backend` defaults to the shared get_backend().
+    Returns (Pxx memmap, freqs, times).
+    """
+    rate, n_samples = analysis_length(WavFile(path), fmax)
+    total = frame_count(n_samples, nfft, noverlap)
+
+    stft = StreamingSTFT(rate, nfft, noverlap, window, backend)
+    pxx = np.lib.format.open_memmap(
+        out_path, mode='w+', dtype=np.float32, shape=(total, nfft // 2 + 1))
+    for _, block in read_blocks(path, block_frames, fmax):
+        start = stft.columns_done
+        columns = stft.push(block)
+        pxx[start:start + len(columns)] = columns
+    pxx.flush()
+    return pxx, stft.freqs(), stft.times()
+
+
+def cached_spectrogram(path, nfft=NFFT, noverlap=NOVERLAP, window='hann', cache=None, fmax=None):
+    """stream_spectrogram() through a SpectrumCache: repeat runs are a memmap away."""
+    cache = cache or SpectrumCache()
+    key = cache.key(path, kind='spectrogram', nfft=nfft, noverlap=noverlap,
+                    window=window, rate=WavFile(path).rate, channels='mean', fmax=fmax,
+                    antialias_db=STOPBAND_DB if fmax else None)
+    entry = cache.get(key)
+    if entry is None:
+        scratch = cache.begin(key)
+        pxx, freqs, times = stream_spectrogram(path, os.path.join(scratch, 'Pxx.npy'),
+                                               nfft=nfft, noverlap=noverlap, window=window, fmax=fmax)
+        del pxx  # Close the map before the directory gets renamed
+        np.save(os.path.join(scratch, 'freqs.npy'), freqs)
+        np.save(os.path.join(scratch, 'times.npy'), times)
+        entry = cache.commit(key, scratch)
+    return entry['Pxx'], entry['freqs'], entry['times']
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from spectrogram_stream import BLOCK_FRAMES, NFFT, NOVERLAP, StreamingSTFT, frame_count, read_blocks
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+POLL_SECONDS = 5.0          # How often --follow checks the recording for new audio
+
+
+class SpectrogramTail:
+    """Keeps an on-disk spectrogram in step with a WAV that is still growing.
+
+    The output is a normal (columns, bins) float32 .npy. Each `update()`
+    looks at how many samples are on disk now, transforms only the columns
+    that became complete since last time, appends their rows to the file
+    and rewrites the header's row count in place (.npy headers are padded
+    for exactly this). Cost is proportional to the new audio only.
+
+    Progress lives in `<out>.state.json`. The STFT overlap needs no saved
+    samples: the next column always starts at columns_done * hop, so the
+    overlap is simply re-read from the WAV. The state is written last, and
+    the .npy is truncated back to it on every update, so an interrupted
+    update is redone cleanly.
+    """
+
+    def __init__(self, wav_path, out_path, nfft=NFFT, noverlap=NOVERLAP, window='hann'):
+        self.wav_path = wav_path
+        self.out_path = out_path
+        self.state_path = out_path + '.state.json'
+        self.params = {'source': os.path.abspath(wav_path), 'nfft': nfft,
+                       'noverlap': noverlap, 'window': window}
+        self.hop = nfft - noverlap
+        self.bins = nfft // 2 + 1
+
+        self.columns_done = 0
+        if os.path.exists(self.state_path) and os.path.exists(out_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state['params'] == self.params:
+                self.columns_done = state['columns_done']
+        if self.columns_done == 0:
+            np.save(out_path, np.empty((0, self.bins), dtype=np.float32))
+            self._save_state()
+
+    def _save_state(self):
+        scratch = self.state_path + '.tmp'
+        with open(scratch, 'w') as f:
+            json.dump({'params': self.params, 'columns_done': self.columns_done}, f)
+        os.replace(scratch, self.state_path)
+
+    def update(self, block_frames=BLOCK_FRAMES):
+        """Append whatever new columns the recording now allows. Returns how many."""
+        wav = WavFile(self.wav_path)
+        start = self.columns_done * self.hop
+        nfft = self.params['nfft']
+        new = frame_count(wav.n_samples - start, nfft, self.params['noverlap'])
+        if new == 0:
+            return 0
+        stop = start + (new - 1) * self.hop + nfft
+
+        stft = StreamingSTFT(wav.rate, nfft, self.params['noverlap'], self.params['window'])
+        row_bytes = self.bins * 4
+        with open(self.out_path, 'r+b') as f:
+            np.lib.format.read_magic(f)
+            np.lib.format.read_array_header_1_0(f)
+            data_offset = f.tell()
+            f.truncate(data_offset + self.columns_done * row_bytes)
+            f.seek(0, os.SEEK_END)
+            for _, block in read_blocks(self.wav_path, block_frames, start=start, stop=stop):
+                f.write(stft.push(block).tobytes())
+
+            total = self.columns_done + stft.columns_done
+            f.seek(0)
+            np.lib.format.write_array_header_1_0(
+                f, {'descr': '<f4', 'fortran_order': False, 'shape': (total, self.bins)})
+            if f.tell() != data_offset:
+                raise RuntimeError(f"{self.out_path}: header grew, cannot extend in place")
+
+        self.columns_done = total
+        self._save_state()
+        return stft.columns_done
+
+    def load(self):
+        """The spectrogram so far, memory-mapped."""
+        return np.load(self.out_path, mmap_mode='r') if self.columns_done else np.load(self.out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally extend the spectrogram of a growing WAV.")
+    parser.add_argument('wav')
+    parser.add_argument('out', help="Output .npy (created or extended)")
+    parser.add_argument('--nfft', type=int, default=NFFT)
+    parser.add_argument('--noverlap', type=int, default=NOVERLAP)
+    parser.add_argument('--follow', action='store_true', help="Keep polling for new audio")
+    parser.add_argument('--interval', type=float, default=POLL_SECONDS)
+    args = parser.parse_args(argv)
+
+    tail = SpectrogramTail(args.wav, args.out, args.nfft, args.noverlap)
+    while True:
+        added = tail.update()
+        if added:
+            print(f"+{added} columns ({tail.columns_done} total)")
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
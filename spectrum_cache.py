@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'audio_spectrum')
+MAX_BYTES = 2 * 1024 ** 3   # Evict least-recently-used entries beyond 2 GB
+SAMPLE_BYTES = 1 << 16      # Fast hash reads this much from start, middle and end
+STALE_SCRATCH = 24 * 3600   # Unpublished scratch dirs untouched this long (s) are from dead runs
+
+
+def file_fingerprint(path, full=False):
+    """Identify a file's content cheaply.
+
+    Default: size + mtime + a hash of three 64 KB samples, which catches any
+    rewrite or edit without reading a multi-GB file. full=True hashes every
+    byte instead (slow, but immune to same-size in-place edits).
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        if full:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+            return f"{stat.st_size}:{digest.hexdigest()}"
+        for offset in (0, stat.st_size // 2, max(stat.st_size - SAMPLE_BYTES, 0)):
+            f.seek(offset)
+            digest.update(f.read(SAMPLE_BYTES))
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{digest.hexdigest()}"
+
+
+def _load(path):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        return np.load(path)  # Empty arrays can't be mapped
+
+
+class SpectrumCache:
+    """On-disk cache of analysis results keyed by file content + parameters.
+
+    Each entry is a directory of plain .npy files, so hits come back as
+    memory maps and load in milliseconds regardless of size. Reading an
+    entry refreshes its mtime; when the cache grows past `max_bytes`, the
+    least recently used entries are deleted first.
+
+    Entries are written into a temporary directory and renamed into place,
+    so a crash mid-write never leaves a half-finished entry behind.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, path, full_hash=False, **params):
+        """Cache key for `path` analysed with `params` (nfft, noverlap, window, ...)."""
+        identity = {'file': file_fingerprint(path, full=full_hash), 'params': params}
+        text = json.dumps(identity, sort_keys=True, default=str)
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def path(self, key):
+        """Directory an entry lives in (whether or not it exists yet)."""
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """{name: memmap} for a cached entry, or None on a miss."""
+        entry = self.path(key)
+        if not os.path.isdir(entry):
+            return None
+        os.utime(entry)  # Mark as recently used
+        return {
+            name[:-4]: _load(os.path.join(entry, name))
+            for name in os.listdir(entry) if name.endswith('.npy')
+        }
+
+    def begin(self, key):
+        """Scratch directory to write a new entry's .npy files into."""
+        return tempfile.mkdtemp(dir=self.root, prefix=key + '.tmp')
+
+    def commit(self, key, scratch):
+        """Publish an entry written under `begin()`, then enforce the size cap."""
+        entry = self.path(key)
+        if os.path.isdir(entry):
+            shutil.rmtree(scratch)  # Someone else got there first
+        else:
+            os.replace(scratch, entry)
+        self.evict(keep=entry)
+        return self.get(key)
+
+    def put(self, key, **arrays):
+        """Store small in-memory arrays as an entry."""
+        scratch = self.begin(key)
+        for name, array in arrays.items():
+            np.save(os.path.join(scratch, name + '.npy'), array)
+        return self.commit(key, scratch)
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the cache fits in max_bytes.
+
+        `keep` (an entry directory) is never evicted, even if it alone is
+        over the limit, so a fresh result is always returned to its caller.
+        Scratch directories left behind by crashed or killed runs are
+        deleted once nothing in them has changed for STALE_SCRATCH seconds.
+        """
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if not os.path.isdir(entry):
+                continue
+            files = list(os.scandir(entry))
+            if '.tmp' in name:
+                touched = max([os.stat(entry).st_mtime] + [f.stat().st_mtime for f in files])
+                if now - touched > STALE_SCRATCH:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            size = sum(f.stat().st_size for f in files)
+            entries.append((os.stat(entry).st_mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
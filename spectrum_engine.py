@@ -0,0 +1,146 @@
+import numpy as np
+
+from bands import BandMapper
+from fft_backend import get_realtime_backend
+
+# --- CONFIGURATION ---
+CHUNK = 1024
+RATE = 44100
+BARS = 180
+FLOOR_DB = 30.0             # dB level that maps to 0.0
+RANGE_DB = 100.0            # dB span that maps onto 0.0 .. 1.0
+
+
+# --- WINDOW CACHE ---
+_WINDOWS = {}
+
+_WINDOW_FUNCS = {
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+    'rect': np.ones,
+}
+
+
+def get_window(size, kind='hann'):
+    """float32 analysis window, built once per (size, kind) and then reused."""
+    key = (size, kind)
+    window = _WINDOWS.get(key)
+    if window is None:
+        window = _WINDOW_FUNCS[kind](size).astype(np.float32)
+        window.flags.writeable = False
+        _WINDOWS[key] = window
+    return window
+
+
+def mid_side(samples, out=None):
+    """(n, 2) left/right -> (n, 2) float32 mid = (L + R) / 2, side = (L - R) / 2."""
+    samples = np.asarray(samples)
+    if samples.ndim != 2 or samples.shape[1] != 2:
+        raise ValueError(f"mid/side needs 2 channels, got shape {samples.shape}")
+    if out is None:
+        out = np.empty(samples.shape, dtype=np.float32)
+    np.add(samples[:, 0], samples[:, 1], out=out[:, 0])
+    np.subtract(samples[:, 0], samples[:, 1], out=out[:, 1])
+    out *= 0.5
+    return out
+
+
+# --- ENGINE ---
+class SpectrumEngine:
+    """Window -> rfft -> (bands) -> dB -> 0..1 levels without per-frame allocations.
+
+    All intermediate arrays are allocated once here and every step writes
+    into them with `out=`. The arrays returned by `process()` and
+    `decibels()` are reused on the next call, so copy them if you need to
+    keep a frame around.
+
+    scale='linear' keeps the original behaviour (the first `bars` FFT bins).
+    'log', 'mel' or 'octave' map the whole spectrum onto bands through a
+    BandMapper instead; for 'octave' the band count is set by the mapper.
+    """
+
+    def __init__(self, size=CHUNK, bars=BARS, window='hann',
+                 floor_db=FLOOR_DB, range_db=RANGE_DB, backend=None,
+                 scale='linear', rate=RATE):
+        self.mapper = None
+        if scale != 'linear':
+            self.mapper = BandMapper(size, rate=rate, n_bands=bars, scale=scale)
+            bars = self.mapper.n_bands
+        self.size = size
+        self.bars = bars
+        self.floor_db = floor_db
+        self.range_db = range_db
+        self.window = get_window(size, window)
+        self.fft = backend or get_realtime_backend()
+
+        # Callers can capture straight into this to skip a copy
+        self.samples = np.zeros(size, dtype=np.int16)
+
+        self._frame = np.empty(size, dtype=np.float32)
+        self._spectrum = np.empty(size // 2 + 1, dtype=np.complex64)
+        self._db = np.empty(size // 2 + 1, dtype=np.float32)
+        self._mag = np.empty(size // 2 + 1, dtype=np.float32)
+        self.levels = np.zeros(bars, dtype=np.float32)
+        self._batch_capacity = 0
+
+    def _transform(self, samples):
+        np.multiply(samples, self.window, out=self._frame)
+        return self.fft.rfft(self._frame, out=self._spectrum)
+
+    def decibels(self, samples):
+        """Full-band magnitude spectrum in dB (size // 2 + 1 bins)."""
+        spectrum = self._transform(samples)
+        db = self._db
+        np.abs(spectrum, out=db)
+        db += 1e-10
+        np.log10(db, out=db)
+        db *= 20
+        return db
+
+    def _levels(self, spectrum, levels, mag):
+        # Works the same on one frame (bins,) and a batch (frames, bins)
+        if self.mapper is None:
+            np.abs(spectrum[..., :self.bars], out=levels)
+        else:
+            np.abs(spectrum, out=mag)
+            self.mapper.apply(mag, out=levels)
+        levels += 1e-10
+        np.log10(levels, out=levels)
+        # (20 * log10(x) - floor) / range, folded into one scale + offset
+        levels *= 20 / self.range_db
+        levels -= self.floor_db / self.range_db
+        np.clip(levels, 0, 1, out=levels)
+        return levels
+
+    def process(self, samples):
+        """`bars` levels scaled to 0..1, same curve the reactors always used."""
+        spectrum = self._transform(samples)
+        return self._levels(spectrum, self.levels, self._mag)
+
+    def _batch_buffers(self, count):
+        # Grow (never shrink) the batch scratch space, then hand out views
+        if count > self._batch_capacity:
+            capacity = max(count, 2 * self._batch_capacity)
+            bins = self.size // 2 + 1
+            self._batch_frame = np.empty((capacity, self.size), dtype=np.float32)
+            self._batch_spectrum = np.empty((capacity, bins), dtype=np.complex64)
+            self._batch_mag = np.empty((capacity, bins), dtype=np.float32)
+            self._batch_levels = np.empty((capacity, self.bars), dtype=np.float32)
+            self._batch_capacity = capacity
+        return (self._batch_frame[:count], self._batch_spectrum[:count],
+                self._batch_mag[:count], self._batch_levels[:count])
+
+    def process_batch(self, frames):
+        """(..., frames, size) samples -> (..., frames, bars) levels in one batched rfft.
+
+        `frames` can be a strided view (e.g. sliding_window_view); it is
+        only read once, while being windowed into the scratch buffer. Extra
+        leading axes (e.g. channels) ride along in the same rfft call.
+        """
+        lead = frames.shape[:-1]
+        buffers = self._batch_buffers(int(np.prod(lead)))
+        frame, spectrum, mag, levels = (b.reshape(lead + b.shape[1:]) for b in buffers)
+        np.multiply(frames, self.window, out=frame)
+        self.fft.rfft(frame, axis=-1, out=spectrum)
+        return self._levels(spectrum, levels, mag)
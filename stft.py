@@ -0,0 +1,121 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from spectrum_engine import mid_side
+
+# --- CONFIGURATION ---
+RATE = 44100
+HOP = 256                   # Samples between analysis frames (~5.8 ms at 44.1 kHz)
+
+
+class STFTScheduler:
+    """Fixed-hop overlapping STFT over a RingBuffer.
+
+    Frames start every `hop` samples and are `engine.size` samples long, no
+    matter how big the capture CHUNK is or how fast the screen redraws. Each
+    render frame calls `update()`, which analyses every hop that has landed
+    since the last call and hands back the newest levels, so the reactors
+    keep drawing exactly as before.
+
+    When the render loop stalls and several hops pile up, they are framed
+    as one strided view over a single copy out of the ring and transformed
+    in one batched rfft, so catching up costs one call instead of a Python
+    loop per hop.
+
+    `smoothing` (0..1, optional) runs an exponential smoother at the hop
+    rate: smoothed = smoothing * smoothed + (1 - smoothing) * frame, applied
+    across a whole batch at once.
+
+    Timestamps are on the stream's own sample clock: a frame's timestamp is
+    the time (in seconds since capture started) of its last sample.
+
+    On a multichannel ring every channel is kept: the frames are viewed as
+    (channels, frames, size) and all of them go through one batched rfft,
+    so levels, peak and smoothed gain a leading channel axis. With
+    mid_side=True a stereo ring is analysed as mid (L + R) / 2 and side
+    (L - R) / 2 instead of left/right.
+    """
+
+    def __init__(self, ring, engine, hop=HOP, rate=RATE, smoothing=None, mid_side=False):
+        self.ring = ring
+        self.engine = engine
+        self.hop = hop
+        self.rate = rate
+        self.window = engine.size
+        self.mid_side = mid_side
+        if mid_side and ring.channels != 2:
+            raise ValueError(f"mid/side needs a stereo ring, got {ring.channels} channels")
+
+        shape = (engine.bars,) if ring.channels == 1 else (ring.channels, engine.bars)
+        self.next_start = max(ring.total_written - self.window, 0)
+        self.timestamp = 0.0
+        self.levels = np.zeros(shape, dtype=np.float32)
+        self.peak = np.zeros(shape, dtype=np.float32)  # Max over the last update()
+        self.smoothing = smoothing
+        self.smoothed = np.zeros(shape, dtype=np.float32)
+        self._span = np.zeros((self.window,) + ring.data.shape[1:], dtype=ring.data.dtype)
+        self._mid_side = np.zeros((self.window, 2), dtype=np.float32) if mid_side else None
+        self.dropped = 0    # Hops lost because we fell a whole ring behind
+
+    def pending(self):
+        """How many complete frames are waiting to be analysed."""
+        ready = self.ring.total_written - self.window - self.next_start
+        return 0 if ready < 0 else ready // self.hop + 1
+
+    def _skip_lost(self):
+        # Anything older than the ring has already been overwritten
+        oldest = self.ring.total_written - self.ring.capacity
+        if self.next_start < oldest:
+            lost = -(-(oldest - self.next_start) // self.hop)
+            self.next_start += lost * self.hop
+            self.dropped += lost
+
+    def batch(self):
+        """Analyse every pending frame in one go.
+
+        Returns (timestamps, levels) with levels shaped (frames, bars), or
+        (channels, frames, bars) on a multichannel ring. Both are empty when
+        nothing is pending; `levels` is a reused buffer.
+        """
+        self._skip_lost()
+        count = self.pending()
+        if count == 0:
+            return np.empty(0), np.empty(self.levels.shape[:-1] + (0, self.engine.bars), dtype=np.float32)
+        start = self.next_start
+        length = (count - 1) * self.hop + self.window
+        if len(self._span) < length:
+            self._span = np.empty((length,) + self._span.shape[1:], dtype=self._span.dtype)
+            if self.mid_side:
+                self._mid_side = np.empty((length, 2), dtype=np.float32)
+        span = self.ring.read(start, length, out=self._span[:length])
+        if self.mid_side:
+            span = mid_side(span, out=self._mid_side[:length])
+        frames = sliding_window_view(span, self.window, axis=0)[::self.hop]
+        if span.ndim == 2:
+            frames = frames.transpose(1, 0, 2)  # (channels, frames, size), still a view
+        levels = self.engine.process_batch(frames)
+        self.next_start = start + count * self.hop
+        ends = start + self.window + self.hop * np.arange(count)
+        return ends / self.rate, levels
+
+    def frames(self):
+        """(timestamp, levels) pairs for every pending frame, oldest first."""
+        timestamps, levels = self.batch()
+        return zip(timestamps, np.moveaxis(levels, -2, 0))
+
+    def update(self):
+        """Analyse everything pending; return the newest frame's levels."""
+        timestamps, levels = self.batch()
+        count = len(timestamps)
+        if count == 0:
+            return self.levels
+        self.levels[:] = levels[..., -1, :]
+        self.timestamp = timestamps[-1]
+        np.max(levels, axis=-2, out=self.peak)
+        if self.smoothing is not None:
+            # Unrolled recursion: older frames get geometrically less weight
+            decay = self.smoothing
+            weights = (1 - decay) * decay ** np.arange(count - 1, -1, -1, dtype=np.float32)
+            self.smoothed *= decay ** count
+            self.smoothed += weights @ levels
+        return self.levels
@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+
+from decimator import STOPBAND_DB
+from spectrogram_stream import NFFT, NOVERLAP, stream_spectrogram
+from spectrum_cache import SpectrumCache
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+TILE_COLUMNS = 512          # Time columns per tile
+TILE_BINS = 256             # Frequency bins per tile
+CHUNK_COLUMNS = 1 << 15     # Columns pooled per pass while building (bounds memory)
+
+
+def _pool_level(src, dst, pool):
+    # Pairs of columns -> one column, a chunk at a time
+    for start in range(0, len(dst), CHUNK_COLUMNS // 2):
+        stop = min(start + CHUNK_COLUMNS // 2, len(dst))
+        block = np.asarray(src[2 * start:2 * stop])
+        if len(block) % 2:
+            block = np.concatenate((block, block[-1:]))  # Odd tail: repeat last column
+        pairs = block.reshape(-1, 2, block.shape[1])
+        dst[start:stop] = pairs.max(axis=1) if pool == 'max' else pairs.mean(axis=1)
+
+
+def build_pyramid(pxx, freqs, times, out_dir, pool='max'):
+    """Write a time-decimated pyramid of a (columns, bins) spectrogram.
+
+    Level 0 is the spectrogram itself; every level above halves the number
+    of columns by max- or mean-pooling neighbouring pairs, until one level
+    fits in a single tile. Each level is one .npy on disk, read back as a
+    memmap so fetching a tile only touches the pages it covers.
+
+    If `pxx` already is `out_dir`/level_0.npy (a memmap of it, as written
+    by stream_spectrogram), it is used in place instead of copied.
+    """
+    if pool not in ('max', 'mean'):
+        raise ValueError(f"pool must be 'max' or 'mean', not '{pool}'")
+    os.makedirs(out_dir, exist_ok=True)
+
+    level_0 = os.path.join(out_dir, 'level_0.npy')
+    source = getattr(pxx, 'filename', None)
+    if source is not None and os.path.exists(level_0) and os.path.samefile(source, level_0):
+        level = pxx
+    else:
+        level = np.lib.format.open_memmap(level_0, mode='w+', dtype=np.float32, shape=pxx.shape)
+        for start in range(0, len(pxx), CHUNK_COLUMNS):
+            level[start:start + CHUNK_COLUMNS] = pxx[start:start + CHUNK_COLUMNS]
+
+    n_levels = 1
+    while len(level) > TILE_COLUMNS:
+        parent = np.lib.format.open_memmap(
+            os.path.join(out_dir, f'level_{n_levels}.npy'), mode='w+',
+            dtype=np.float32, shape=((len(level) + 1) // 2, level.shape[1]))
+        _pool_level(level, parent, pool)
+        parent.flush()
+        level = parent
+        n_levels += 1
+
+    meta = {
+        'levels': n_levels,
+        'pool': pool,
+        'columns': len(pxx),
+        't0': float(times[0]) if len(times) else 0.0,
+        'dt': float(times[1] - times[0]) if len(times) > 1 else 0.0,
+        'freqs': np.asarray(freqs).tolist(),
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return n_levels
+
+
+class TilePyramid:
+    """Read side of a pyramid written by build_pyramid()."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.pool = meta['pool']
+        self.t0 = meta['t0']
+        self.dt = meta['dt']
+        self.freqs = np.array(meta['freqs'])
+        self.levels = [np.load(os.path.join(directory, f'level_{k}.npy'), mmap_mode='r')
+                       for k in range(meta['levels'])]
+
+    def column_time(self, level, column):
+        """Centre time (s) of a column at a level (pooled columns span 2**level)."""
+        scale = 2 ** level
+        return self.t0 + (column * scale + (scale - 1) / 2) * self.dt
+
+    def tile(self, level, tx, ty):
+        """One TILE_COLUMNS x TILE_BINS tile (smaller at the edges)."""
+        data = self.levels[level]
+        return data[tx * TILE_COLUMNS:(tx + 1) * TILE_COLUMNS,
+                    ty * TILE_BINS:(ty + 1) * TILE_BINS]
+
+    def pick_level(self, t_start, t_stop, max_columns):
+        """Finest level that shows [t_start, t_stop] in at most max_columns columns."""
+        span = max(t_stop - t_start, self.dt) / self.dt if self.dt else 1
+        level = int(np.ceil(np.log2(max(span / max_columns, 1))))
+        return min(level, len(self.levels) - 1)
+
+    def view(self, t_start, t_stop, f_start=0.0, f_stop=None, max_columns=2000):
+        """Data for a visible window, fetched from the right level of detail.
+
+        Returns (array (columns, bins), extent [t0, t1, f0, f1]) ready for
+        imshow(array.T, extent=extent, origin='lower').
+        """
+        level = self.pick_level(t_start, t_stop, max_columns)
+        data = self.levels[level]
+        scale = 2 ** level
+        c0 = max(int((t_start - self.t0) / (self.dt * scale)) if self.dt else 0, 0)
+        c1 = min(int(np.ceil((t_stop - self.t0) / (self.dt * scale))) + 1 if self.dt else len(data), len(data))
+        f_stop = self.freqs[-1] if f_stop is None else f_stop
+        b0 = int(np.searchsorted(self.freqs, f_start))
+        b1 = int(np.searchsorted(self.freqs, f_stop, side='right'))
+        c0, b0 = min(c0, len(data) - 1), min(b0, len(self.freqs) - 1)
+        c1, b1 = max(c1, c0 + 1), max(b1, b0 + 1)
+        extent = [self.column_time(level, c0), self.column_time(level, c1 - 1),
+                  self.freqs[b0], self.freqs[min(b1, len(self.freqs)) - 1]]
+        return np.asarray(data[c0:c1, b0:b1]), extent
+
+
+def cached_pyramid(path, nfft=NFFT, noverlap=NOVERLAP, pool='max', cache=None, fmax=None):
+    """Spectrogram + pyramid for a WAV, kept in the SpectrumCache as one entry.
+
+    The spectrogram is streamed straight into the entry as level 0, so it
+    is stored once (not once in a spectrogram entry and again as a copy),
+    eviction can't split it from the levels above it, and a hit does no
+    STFT work at all.
+    """
+    cache = cache or SpectrumCache()
+    key = cache.key(path, kind='pyramid', nfft=nfft, noverlap=noverlap, window='hann',
+                    rate=WavFile(path).rate, channels='mean', pool=pool,
+                    tile=(TILE_COLUMNS, TILE_BINS), fmax=fmax,
+                    antialias_db=STOPBAND_DB if fmax else None)
+    if cache.get(key) is None:
+        scratch = cache.begin(key)
+        pxx, freqs, times = stream_spectrogram(path, os.path.join(scratch, 'level_0.npy'),
+                                               nfft=nfft, noverlap=noverlap, fmax=fmax)
+        build_pyramid(pxx, freqs, times, scratch, pool)
+        del pxx  # Close the map before the directory gets renamed
+        cache.commit(key, scratch)
+    return TilePyramid(cache.path(key))
@@ -1,22 +1,24 @@
- import numpy as np # type: ignore
+import numpy as np # type: ignore
 import matplotlib.pyplot as plt # type: ignore
 
+from signal_gen import Tones
+from zoom_fft import ZoomSpectrum
+
 # 1. Setup the "Digital" Environment
 sample_rate = 44100  # Standard audio sampling rate (Hz)
 duration = 0.1       # Duration in seconds (short, for zooming in)
-t = np.linspace(0, duration, int(sample_rate * duration))
 
 # 2. Create two distinct signals
 # Low frequency (Bass) - 50 Hz
 f1 = 50 
-signal_low = np.sin(2 * np.pi * f1 * t)
 
 # High frequency (Treble) - 1000 Hz
 f2 = 1000
-signal_high = 0.5 * np.sin(2 * np.pi * f2 * t) # 0.5 amplitude (quieter)
 
 # 3. Mix them together (Superposition)
-mixed_signal = signal_low + signal_high
+# 0.5 amplitude on the treble (quieter)
+mixed_signal = Tones([f1, f2], amps=[1.0, 0.5], rate=sample_rate).generate(duration)
+t = np.arange(len(mixed_signal)) / sample_rate
 
 # 4. Visualize the result
 plt.figure(figsize=(10, 4))
@@ -29,20 +31,17 @@ plt.show()
 
 # ... (Keep all your previous code from Phase 1) ...
 
-# 5. Compute the FFT (The DSP Magic)
+# 5. Compute the Spectrum (The DSP Magic)
+# We only care about 0-1200 Hz, so instead of a full FFT we "zoom in":
+# a chirp-z transform evaluates just that band, at 0.5 Hz spacing.
 n = len(mixed_signal)                 # Total number of samples
-freqs = np.fft.fftfreq(n, d=1/sample_rate) # Get the frequency axis
-fft_values = np.fft.fft(mixed_signal)      # Compute the transform
+zoom = ZoomSpectrum(n, sample_rate, f_start=0, f_stop=1200, points=2401)
+freqs_pos = zoom.freqs
 
 # 6. Clean up the data
-# FFT returns complex numbers; we only want the Magnitude (absolute value)
-magnitude = np.abs(fft_values) / n 
-
-# FFT returns both positive and negative frequencies (mirror image).
-# We only need the positive half.
-half_n = n // 2
-freqs_pos = freqs[:half_n]
-magnitude_pos = magnitude[:half_n] * 2 # *2 to conserve total energy
+# The transform returns complex numbers; we only want the Magnitude.
+# Scaled by 2/n like a one-sided FFT, so a sine of amplitude 1 peaks near 1.
+magnitude_pos = zoom.magnitude(mixed_signal)
 
 # 7. Plot the Frequency Spectrum
 plt.figure(figsize=(10, 4))
@@ -1,46 +1,99 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.io import wavfile
 
-# 1. Load the real audio file
+from spectrum_cache import SpectrumCache
+from wav_reader import WavFile
+from waveform_index import WaveformIndex
+from welch import cached_welch_spectrum
+
+# --- CONFIGURATION ---
+WHOLE_FILE = True           # True = Welch average over the whole file, False = FFT of the first second
+FMAX = None                 # Whole-file mode: e.g. 1200 decimates first for a finer low-band spectrum
+CHANNELS = 'mean'           # Whole-file mode: 'mean' (mono mix), 'all' (one curve per channel) or 'midside'
+
+# 1. Open the real audio file (memory-mapped: nothing is read yet)
 # MAKE SURE 'test_audio.wav' is in the same folder as this script!
 try:
-    sample_rate, data = wavfile.read('test_audio.wav')
+    wav = WavFile('test_audio.wav')
+    sample_rate = wav.rate
     print(f"File loaded. Sample Rate: {sample_rate} Hz")
 except FileNotFoundError:
     print("ERROR: Could not find 'test_audio.wav'. Please check the filename.")
     exit()
 
-# 2. Handle Stereo vs Mono
-# Real audio often has 2 channels (Left/Right). 
-# We need to mix them into 1 channel (Mono) for a simple FFT.
-if len(data.shape) > 1:
-    print(f"Stereo file detected. Channels: {data.shape[1]}")
-    data = data.mean(axis=1) # Average L and R channels
+if wav.channels > 1:
+    print(f"Stereo file detected. Channels: {wav.channels}")
 else:
     print("Mono file detected.")
 
-# 3. Focus on a small slice (Audio files are huge!)
-# Let's take just the first 1 second of audio to analyze
-num_samples_to_take = sample_rate * 1 
-data_slice = data[:num_samples_to_take]
+# Whole-file waveform overview
+# Drawn from the min/max/RMS index (built once, saved next to the file),
+# so even a multi-hour recording is only a few thousand points.
+index = WaveformIndex.load(wav.path)
+times, mins, maxs, rms = index.envelope()
+plt.figure(figsize=(12, 4))
+plt.fill_between(times, mins, maxs, color='lightblue', linewidth=0, label="Peak")
+plt.fill_between(times, -rms, rms, color='blue', linewidth=0, label="RMS")
+plt.title(f"Waveform Overview ({wav.duration:.1f} s)")
+plt.xlabel("Time (seconds)")
+plt.ylabel("Amplitude")
+plt.legend()
+plt.show()
+
+# Re-runs on the same file + settings load the spectrum from the cache
+cache = SpectrumCache()
+
+if WHOLE_FILE:
+    # 2-4. Welch's method: average the power spectrum of overlapping frames
+    # across the WHOLE file. Memory stays at one block + one spectrum.
+    freqs_pos, psd = cached_welch_spectrum(wav.path, cache=cache, fmax=FMAX, channels=CHANNELS)
+    spectrum = 10 * np.log10(psd + 1e-20)
+    if CHANNELS == 'midside':
+        labels = ["Mid", "Side"]
+    elif CHANNELS == 'all':
+        labels = [f"Channel {i + 1}" for i in range(wav.channels)]
+    title, ylabel = "Long-Term Average Spectrum of Real Audio", "Power (dB/Hz)"
+else:
+    key = cache.key(wav.path, kind='fft', seconds=1, channels='mean', rate=sample_rate)
+    entry = cache.get(key)
+
+    if entry is None:
+        # 2. Focus on a small slice
+        # Let's take just the first 1 second of audio to analyze.
+        # Slicing the map only touches the pages for that second.
+        num_samples_to_take = sample_rate * 1
+        data_slice = wav.to_float(wav.data[:num_samples_to_take])
 
-# 4. Compute FFT (Same logic as before)
-n = len(data_slice)
-freqs = np.fft.fftfreq(n, d=1/sample_rate)
-fft_values = np.fft.fft(data_slice)
+        # 3. Handle Stereo vs Mono
+        # Real audio often has 2 channels (Left/Right).
+        # We need to mix them into 1 channel (Mono) for a simple FFT.
+        if wav.channels > 1:
+            data_slice = data_slice.mean(axis=1) # Average L and R channels (only for our slice)
+        else:
+            data_slice = data_slice[:, 0]
 
-magnitude = np.abs(fft_values) / n
-half_n = n // 2
-freqs_pos = freqs[:half_n]
-magnitude_pos = magnitude[:half_n] * 2
+        # 4. Compute FFT
+        # rfft only computes the positive half, which is all we plot anyway
+        n = len(data_slice)
+        half_n = n // 2
+        freqs = np.fft.rfftfreq(n, d=1/sample_rate)
+        magnitude = np.abs(np.fft.rfft(data_slice)) / n
+        entry = cache.put(key, freqs=freqs[:half_n], magnitude=magnitude[:half_n] * 2)
+
+    freqs_pos, spectrum = entry['freqs'], entry['magnitude']
+    title, ylabel = "Frequency Spectrum of Real Audio", "Magnitude"
 
 # 5. Plot the Real Spectrum
 plt.figure(figsize=(12, 6))
-plt.plot(freqs_pos, magnitude_pos, color='blue')
-plt.title("Frequency Spectrum of Real Audio")
+if spectrum.ndim == 2:
+    for curve, label in zip(spectrum, labels):
+        plt.plot(freqs_pos, curve, label=label)
+    plt.legend()
+else:
+    plt.plot(freqs_pos, spectrum, color='blue')
+plt.title(title)
 plt.xlabel("Frequency (Hz)")
-plt.ylabel("Magnitude")
+plt.ylabel(ylabel)
 
 # Audio usually lives in 20Hz - 20,000Hz. 
 # Logarithmic scale is better for audio visualization
@@ -0,0 +1,115 @@
+import os
+import struct
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- WAV FORMAT CODES ---
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.uint8,
+    (WAVE_FORMAT_PCM, 16): np.dtype('<i2'),
+    (WAVE_FORMAT_PCM, 24): np.uint8,  # Packed 3-byte samples, mapped as (samples, channels, 3)
+    (WAVE_FORMAT_PCM, 32): np.dtype('<i4'),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype('<f4'),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype('<f8'),
+}
+
+
+class WavFile:
+    """A WAV file whose sample data is memory-mapped, not read.
+
+    Only the header is parsed here; `data` is an np.memmap shaped
+    (samples, channels) straight over the file's data chunk, so opening a
+    multi-gigabyte recording is instant and the OS page cache decides what
+    is actually in RAM. `channel()` and `frames()` return views of that map,
+    never copies.
+
+    24-bit PCM has no numpy dtype, so it is mapped as raw bytes, shaped
+    (samples, channels, 3); `to_float()` and `channel()` sign-extend it a
+    block at a time (copies, unlike the other formats). `full_scale` is
+    the raw value of a full-scale sample for every format.
+
+    A data chunk whose size field is 0 or runs past the end of the file
+    (a recorder still writing) is clamped to the whole samples on disk.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave_id != b'WAVE':
+                raise ValueError(f"{self.path}: not a RIFF/WAVE file")
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"{self.path}: no data chunk")
+                chunk_id, size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(size)
+                    f.seek(size % 2, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    self.data_offset = f.tell()
+                    data_size = size
+                    break
+                else:
+                    f.seek(size + size % 2, os.SEEK_CUR)
+        if fmt is None:
+            raise ValueError(f"{self.path}: data chunk before fmt chunk")
+
+        tag, self.channels, self.rate, _, self.block_align, self.bits = struct.unpack('<HHIIHH', fmt[:16])
+        if tag == WAVE_FORMAT_EXTENSIBLE:
+            tag = struct.unpack('<H', fmt[24:26])[0]  # First two bytes of the sub-format GUID
+        self.dtype = _DTYPES.get((tag, self.bits))
+        if self.dtype is None:
+            raise ValueError(f"{self.path}: format {tag:#x} at {self.bits}-bit cannot be memory-mapped")
+        self.packed24 = self.bits == 24
+        self.full_scale = 1.0 if tag == WAVE_FORMAT_IEEE_FLOAT else float(2 ** (self.bits - 1))
+        shape = (self.channels, 3) if self.packed24 else (self.channels,)
+
+        on_disk = os.path.getsize(self.path) - self.data_offset
+        if data_size == 0 or data_size > on_disk:
+            data_size = on_disk
+        self.n_samples = data_size // self.block_align
+        if self.n_samples == 0:
+            self.data = np.zeros((0,) + shape, dtype=self.dtype)
+        else:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.data_offset,
+                                  shape=(self.n_samples,) + shape)
+
+    @property
+    def duration(self):
+        return self.n_samples / self.rate
+
+    def channel(self, index):
+        """One channel as a strided view of the map (no copy; float32 copy for 24-bit)."""
+        if self.packed24:
+            return self.to_float(self.data[:, index])
+        return self.data[:, index]
+
+    def frames(self, nfft, hop, channel=0, start=0, stop=None):
+        """(columns, nfft) strided STFT frames over the mapped samples."""
+        if self.packed24:
+            samples = self.to_float(self.data[start:stop, channel])
+        else:
+            samples = self.channel(channel)[start:stop]
+        if len(samples) < nfft:
+            return np.empty((0, nfft), dtype=samples.dtype)
+        return sliding_window_view(samples, nfft)[::hop]
+
+    def to_float(self, block):
+        """Copy a slice of raw samples to float32, centring unsigned 8-bit."""
+        if self.packed24:
+            # Bytes 1..3 of a little-endian int32, then an arithmetic shift sign-extends
+            block = np.asarray(block)
+            wide = np.zeros(block.shape[:-1] + (4,), dtype=np.uint8)
+            wide[..., 1:] = block
+            return (wide.view('<i4')[..., 0] >> 8).astype(np.float32)
+        out = np.array(block, dtype=np.float32)
+        if self.dtype is np.uint8:
+            out -= 128
+        return out
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+BLOCK_SIZES = (256, 4096, 65536)    # Samples per envelope point at each level
+READ_BLOCK = 1 << 20                # Samples per read while building (multiple of 65536)
+INDEX_SUFFIX = '.wavidx.npz'
+
+
+class WaveformIndex:
+    """Min/max/RMS overview of a WAV's (mono mixdown) waveform.
+
+    Built in one streaming pass and stored next to the recording as
+    `<file>.wavidx.npz`. Drawing a multi-hour file then only needs a few
+    thousand envelope points from the right level instead of every sample.
+    The index remembers the source's size and mtime and is rebuilt by
+    `load()` when they no longer match.
+    """
+
+    def __init__(self, rate, levels, source_stamp):
+        self.rate = rate
+        self.levels = levels  # {block_size: (mins, maxs, rms)}
+        self.source_stamp = source_stamp
+
+    @classmethod
+    def build(cls, path):
+        wav = WavFile(path)
+        finest = BLOCK_SIZES[0]
+        n_blocks = -(-wav.n_samples // finest)
+        mins = np.empty(n_blocks, dtype=np.float32)
+        maxs = np.empty(n_blocks, dtype=np.float32)
+        sq = np.empty(n_blocks, dtype=np.float64)  # Mean of squares, for RMS
+
+        # One pass at the finest block size...
+        for pos in range(0, wav.n_samples, READ_BLOCK):
+            block = wav.to_float(wav.data[pos:pos + READ_BLOCK]).mean(axis=1)
+            pad = -len(block) % finest
+            if pad:
+                block = np.concatenate((block, np.full(pad, block[-1], dtype=np.float32)))
+            blocks = block.reshape(-1, finest)
+            i = pos // finest
+            mins[i:i + len(blocks)] = blocks.min(axis=1)
+            maxs[i:i + len(blocks)] = blocks.max(axis=1)
+            sq[i:i + len(blocks)] = np.mean(np.square(blocks, dtype=np.float64), axis=1)
+
+        # ...then every coarser level is reduced from the one below it
+        levels = {finest: (mins, maxs, np.sqrt(sq).astype(np.float32))}
+        for size in BLOCK_SIZES[1:]:
+            factor = size // finest
+            pad = -len(mins) % factor
+            c_min = np.pad(mins, (0, pad), mode='edge').reshape(-1, factor).min(axis=1)
+            c_max = np.pad(maxs, (0, pad), mode='edge').reshape(-1, factor).max(axis=1)
+            c_sq = np.pad(sq, (0, pad), mode='edge').reshape(-1, factor).mean(axis=1)
+            levels[size] = (c_min, c_max, np.sqrt(c_sq).astype(np.float32))
+
+        index = cls(wav.rate, levels, _stamp(path))
+        index.save(path + INDEX_SUFFIX)
+        return index
+
+    def save(self, index_path):
+        arrays = {'rate': self.rate, 'stamp': np.array(self.source_stamp)}
+        for size, (mins, maxs, rms) in self.levels.items():
+            arrays[f'min_{size}'], arrays[f'max_{size}'], arrays[f'rms_{size}'] = mins, maxs, rms
+        with open(index_path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Index for `path`, rebuilt if missing or stale."""
+        index_path = path + INDEX_SUFFIX
+        if os.path.exists(index_path):
+            with np.load(index_path) as data:
+                if tuple(data['stamp']) == _stamp(path):
+                    levels = {size: (data[f'min_{size}'], data[f'max_{size}'], data[f'rms_{size}'])
+                              for size in BLOCK_SIZES}
+                    return cls(int(data['rate']), levels, tuple(data['stamp']))
+        return cls.build(path)
+
+    def envelope(self, t_start=0.0, t_stop=None, max_points=4000):
+        """(times, mins, maxs, rms) for a time window from the finest level that fits."""
+        for size in BLOCK_SIZES:
+            mins, maxs, rms = self.levels[size]
+            dt = size / self.rate
+            stop = len(mins) if t_stop is None else min(int(np.ceil(t_stop / dt)), len(mins))
+            start = max(int(t_start / dt), 0)
+            if stop - start <= max_points:
+                break
+        times = (np.arange(start, stop) + 0.5) * dt
+        return times, mins[start:stop], maxs[start:stop], rms[start:stop]
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from decimator import STOPBAND_DB
+from spectrogram_stream import BLOCK_FRAMES, StreamingSTFT, read_blocks
+from spectrum_cache import SpectrumCache
+from wav_reader import WavFile
+
+# --- CONFIGURATION ---
+NFFT = 4096                 # ~10.8 Hz resolution at 44.1 kHz
+NOVERLAP = NFFT // 2
+
+
+def welch_spectrum(path, nfft=NFFT, noverlap=NOVERLAP, window='hann', block_frames=BLOCK_FRAMES,
+                   fmax=None, channels='mean'):
+    """Long-term average spectrum of a whole WAV (Welch's method).
+
+    Walks the file in overlapping windowed frames with rfft and sums the
+    one-sided PSD into a single (nfft // 2 + 1) accumulator, so memory is a
+    read block plus one spectrum no matter how long the recording is.
+    Returns (freqs, psd) with the same scaling as scipy.signal.welch.
+    `fmax` decimates first, for a finer low-band spectrum from the same nfft.
+    `channels` is passed to read_blocks: 'all' or 'midside' give one
+    spectrum per channel, psd shaped (channels, bins).
+    """
+    stft = None
+    total = None
+    for rate, block in read_blocks(path, block_frames, fmax, channels=channels):
+        if stft is None:
+            stft = StreamingSTFT(rate, nfft, noverlap, window)
+            total = np.zeros(block.shape[1:] + (nfft // 2 + 1,), dtype=np.float64)
+        columns = stft.push(block)
+        total += columns.sum(axis=-2, dtype=np.float64)
+    if stft is None or stft.columns_done == 0:
+        raise ValueError(f"{path}: shorter than one {nfft}-sample frame")
+    return stft.freqs(), total / stft.columns_done
+
+
+def cached_welch_spectrum(path, nfft=NFFT, noverlap=NOVERLAP, window='hann', cache=None, fmax=None,
+                          channels='mean'):
+    """welch_spectrum() through the SpectrumCache."""
+    cache = cache or SpectrumCache()
+    key = cache.key(path, kind='welch', nfft=nfft, noverlap=noverlap, window=window,
+                    rate=WavFile(path).rate, channels=channels, fmax=fmax,
+                    antialias_db=STOPBAND_DB if fmax else None)
+    entry = cache.get(key)
+    if entry is None:
+        freqs, psd = welch_spectrum(path, nfft, noverlap, window, fmax=fmax, channels=channels)
+        entry = cache.put(key, freqs=freqs, psd=psd)
+    return entry['freqs'], entry['psd']